@@ -1,2 +1,35 @@
-from floatRandom import RandomArbitrary
-from intRandom import RandomArbitraryInteger
\ No newline at end of file
+'''Random numbers from arbitrary distributions
+
+The public classes are imported on first access (PEP 562), so that
+`import randomArbitrary` is cheap and does not import NumPy.
+'''
+import importlib
+
+#public name -> submodule that defines it
+_EXPORTS = {
+    'RandomArbitrary': 'floatRandom',
+    'RandomArbitraryInteger': 'intRandom',
+    'RandomArbitraryIntegerBatch': 'batchRandom',
+    'RandomArbitraryIntegerDynamic': 'dynamicRandom',
+    'SamplerCache': 'samplerCache',
+    'cachedSampler': 'samplerCache',
+    'StreamingHistogram': 'histogram',
+    'RandomArbitraryGrid': 'gridRandom',
+    'WeightedReservoir': 'reservoir',
+    'RandomArbitraryTimeVarying': 'timeRandom',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError('module %r has no attribute %r' % (__name__, name))
+    module = importlib.import_module('.' + _EXPORTS[name], __name__)
+    value = getattr(module, name)
+    globals()[name] = value #later lookups do not call __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
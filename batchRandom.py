@@ -0,0 +1,83 @@
+import numpy as np
+
+from .intRandom import _buildAliasTables
+
+
+class RandomArbitraryIntegerBatch():
+    '''Random integer numbers from many arbitrary distributions at once.
+
+    The alias tables of all the distributions are packed back to back into
+    flat arrays, and `sample` draws one number from each of a vector of
+    distributions in a single vectorized call. Every table covers only the
+    values given for its distribution (like the sparse mode of
+    RandomArbitraryInteger).
+    '''
+    def __init__(self, xs, ps=None, seed=None):
+        '''Initialize the object
+
+        @param xs: sequence of integer value sequences, one per distribution
+        @param ps: sequence of probability density profiles, one per
+            distribution. If None (default) every value of a distribution
+            will have the same probability
+        @param seed: None, an int, a numpy.random.SeedSequence, BitGenerator or
+            Generator. Anything numpy.random.default_rng accepts
+        '''
+        if ps is None:
+            ps = [np.ones(len(x)) for x in xs]
+        assert len(xs) == len(ps)
+        self._rng = np.random.default_rng(seed)
+        self.set_pdfs(xs, ps)
+
+    def __len__(self):
+        return len(self._lengths)
+
+    def set_pdfs(self, xs, ps):
+        '''Set the probability distribution functions of all the distributions
+
+        All the tables are built in a single batched pass.
+        '''
+        assert len(xs) == len(ps)
+        lengths = np.array([len(x) for x in xs], dtype=np.intp)
+        if not np.all(lengths == [len(p) for p in ps]):
+            raise ValueError('Every x must have the same length as its p')
+        if np.any(lengths == 0):
+            raise ValueError('Every distribution needs at least one value')
+        values = np.concatenate([np.asarray(x) for x in xs]).astype(np.int64)
+        p = np.concatenate([np.asarray(v, dtype=float) for v in ps])
+        if np.any(p < 0):
+            raise ValueError('Negative PDF values are not allowed')
+        offsets = np.concatenate(([0], lengths.cumsum()[:-1]))
+        if np.any(np.add.reduceat(p, offsets) == 0):
+            raise ValueError('At least one non-zero PDF value is required '
+                             'in every distribution')
+
+        self._lengths = lengths
+        self._offsets = offsets
+        self._values = values
+        self._prob, self._alias = _buildAliasTables(p, lengths)
+
+    def sample(self, ids):
+        '''Draw one random number from each of the distributions in `ids`
+
+        @param ids: distribution index or array of indices (may repeat)
+        @return: a scalar if `ids` is a scalar, otherwise a numpy array of
+            the shape of `ids`
+        '''
+        shape = np.shape(ids)
+        ids = np.asarray(ids, dtype=np.intp).reshape(-1)
+        n = self._lengths[ids]
+        u = self._rng.random(len(ids)) * n
+        j = np.floor(u)
+        u -= j
+        j = j.astype(np.intp)
+        np.minimum(j, n - 1, out=j) #guard against u rounding up to n
+        j += self._offsets[ids]
+        ret = np.where(u < self._prob[j], j, self._alias[j])
+        ret = self._values[ret]
+        if shape == ():
+            return ret[0]
+        return ret.reshape(shape)
+
+
+if __name__ == '__main__':
+    pass
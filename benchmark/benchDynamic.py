@@ -0,0 +1,51 @@
+'''Mixed update/sample workload: RandomArbitraryIntegerDynamic.update versus
+rebuilding the alias table of RandomArbitraryInteger with set_pdf after
+every weight change.
+
+Usage: python benchDynamic.py [nValues] [rounds] [samplesPerRound]
+'''
+import sys
+import time
+sys.path.append(r'../../')
+import randomArbitrary
+import numpy as np
+
+
+def benchRebuild(x, p, changes, samplesPerRound):
+    '''Return the seconds taken by set_pdf + random(n) rounds'''
+    rng = randomArbitrary.RandomArbitraryInteger(x, p)
+    p = p.copy()
+    t0 = time.time()
+    for i, w in changes:
+        p[i] = w
+        rng.set_pdf(x, p)
+        rng.random(samplesPerRound)
+    return time.time() - t0
+
+
+def benchDynamic(x, p, changes, samplesPerRound):
+    '''Return the seconds taken by update + random(n) rounds'''
+    rng = randomArbitrary.RandomArbitraryIntegerDynamic(x, p)
+    t0 = time.time()
+    for i, w in changes:
+        rng.update(x[i], w)
+        rng.random(samplesPerRound)
+    return time.time() - t0
+
+
+if __name__ == '__main__':
+    args = [int(a) for a in sys.argv[1:]]
+    nValues, rounds, samplesPerRound = args + [10 ** 5, 1000, 100][len(args):]
+    x = np.arange(nValues)
+    p = np.random.rand(nValues)
+    changes = list(zip(np.random.randint(0, nValues, rounds).tolist(),
+                       np.random.rand(rounds).tolist()))
+    print('%d values, %d rounds of 1 update + %d samples' % (
+        nValues, rounds, samplesPerRound))
+    tRebuild = benchRebuild(x, p, changes, samplesPerRound)
+    tDynamic = benchDynamic(x, p, changes, samplesPerRound)
+    print('%12s %10s %14s' % ('method', 'seconds', 'us per round'))
+    print('%12s %10.3f %14.1f' % ('set_pdf', tRebuild,
+                                  tRebuild / rounds * 1e6))
+    print('%12s %10.3f %14.1f' % ('update', tDynamic,
+                                  tDynamic / rounds * 1e6))
@@ -0,0 +1,47 @@
+'''Throughput and accuracy of the 'table' and 'exact' sampling modes of
+RandomArbitrary for several support sizes and look up table sizes.
+
+Accuracy is the Kolmogorov-Smirnov statistic of the sample against the
+piecewise linear cdf of the requested pdf (smaller is better).
+
+Usage: python benchFloatModes.py [nSamples]
+'''
+import sys
+import time
+sys.path.append(r'../../')
+import randomArbitrary
+import numpy as np
+import scipy.stats as stats
+
+
+def ksStatistic(theSample, x, p):
+    '''KS statistic of `theSample` against the piecewise linear cdf'''
+    cdf = np.cumsum(p) / np.sum(p)
+    return stats.kstest(theSample, lambda v: np.interp(v, x, cdf, 0, 1.0))[0]
+
+
+def benchMode(x, p, mode, Nrl, nSamples):
+    '''Return (samples per second, KS statistic)'''
+    rng = randomArbitrary.RandomArbitrary(x=x, p=p, Nrl=Nrl, mode=mode)
+    t0 = time.time()
+    theSample = rng.random(nSamples)
+    elapsed = time.time() - t0
+    return nSamples / elapsed, ksStatistic(theSample, x, p)
+
+
+if __name__ == '__main__':
+    nSamples = 10 ** 6
+    if len(sys.argv) > 1:
+        nSamples = int(sys.argv[1])
+    print('%10s %6s %10s %14s %10s' % ('len(x)', 'mode', 'Nrl',
+                                        'samples/s', 'KS'))
+    for lenX in (100, 10 ** 4, 10 ** 6):
+        x = np.linspace(-1.0, 1.0, lenX)
+        p = np.exp(-x ** 2 / 0.02) #narrow peak, hard for coarse tables
+        p[0] = 0.0
+        for Nrl in (10 ** 3, 10 ** 5, 10 ** 6):
+            rate, ks = benchMode(x, p, 'table', Nrl, nSamples)
+            print('%10d %6s %10d %14.3g %10.5f' % (lenX, 'table', Nrl,
+                                                   rate, ks))
+        rate, ks = benchMode(x, p, 'exact', None, nSamples)
+        print('%10d %6s %10s %14.3g %10.5f' % (lenX, 'exact', '-', rate, ks))
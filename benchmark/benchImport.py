@@ -0,0 +1,50 @@
+'''Start-up cost of the package: the time to import it, to access a sampler
+class (which imports NumPy) and to build a first sampler, each measured in
+fresh interpreters. `import randomArbitrary` alone must not import NumPy.
+
+Usage: python benchImport.py [repeats]
+'''
+import os
+import subprocess
+import sys
+
+PACKAGE_PARENT = os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                              '..', '..'))
+CASES = (
+    ('import', 'import randomArbitrary'),
+    ('class', 'import randomArbitrary; randomArbitrary.RandomArbitraryInteger'),
+    ('sampler', 'import randomArbitrary; '
+                'randomArbitrary.RandomArbitraryInteger([1, 2, 3]).random()'),
+)
+TIMED = '''
+import sys, time
+t0 = time.perf_counter()
+%s
+elapsed = time.perf_counter() - t0
+print(elapsed, 'numpy' in sys.modules)
+'''
+
+
+def benchStatement(statement, repeats):
+    '''Return (best seconds, whether NumPy got imported) over fresh
+    interpreters'''
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [PACKAGE_PARENT] + [p for p in [env.get('PYTHONPATH')] if p])
+    best = float('inf')
+    for r in range(repeats): #@UnusedVariable
+        out = subprocess.check_output([sys.executable, '-c',
+                                       TIMED % statement], env=env)
+        seconds, numpyImported = out.split()
+        best = min(best, float(seconds))
+    return best, numpyImported == b'True'
+
+
+if __name__ == '__main__':
+    repeats = 10
+    if len(sys.argv) > 1:
+        repeats = int(sys.argv[1])
+    print('%10s %12s %8s' % ('case', 'ms', 'numpy'))
+    for name, statement in CASES:
+        seconds, numpyImported = benchStatement(statement, repeats)
+        print('%10s %12.2f %8s' % (name, seconds * 1e3, numpyImported))
@@ -0,0 +1,37 @@
+'''Throughput of random_parallel as a function of the number of threads.
+
+Usage: python benchParallel.py [nSamples]
+'''
+import multiprocessing
+import sys
+import time
+sys.path.append(r'../../')
+import randomArbitrary
+import numpy as np
+
+
+def benchParallel(sampler, n, workers):
+    '''Return samples per second of sampler.random_parallel'''
+    t0 = time.time()
+    sampler.random_parallel(n, workers=workers)
+    return n / (time.time() - t0)
+
+
+if __name__ == '__main__':
+    n = 10 ** 8
+    if len(sys.argv) > 1:
+        n = int(sys.argv[1])
+    x = np.arange(10 ** 4)
+    p = np.exp(np.random.randn(len(x)))
+    samplers = (('float', randomArbitrary.RandomArbitrary(x, p, Nrl=10 ** 5)),
+                ('integer', randomArbitrary.RandomArbitraryInteger(x, p)))
+    nCpu = multiprocessing.cpu_count()
+    lWorkers = sorted(set([1, 2, 4, 8, nCpu]))
+    print('%8s %8s %14s %8s' % ('sampler', 'workers', 'samples/s', 'speedup'))
+    for name, sampler in samplers:
+        base = None
+        for workers in lWorkers:
+            rate = benchParallel(sampler, n, workers)
+            if base is None:
+                base = rate
+            print('%8s %8d %14.3g %8.2f' % (name, workers, rate, rate / base))
@@ -0,0 +1,49 @@
+'''Memory allocated by repeated random(n) calls versus random_into(out).
+
+tracemalloc reports the peak memory allocated while the hot loop runs, after
+a warm-up call that allocates the scratch buffers of random_into. A peak of
+a few hundred bytes means that no arrays are allocated in the loop.
+
+Usage: python benchRandomInto.py [n] [calls]
+'''
+import sys
+import time
+import tracemalloc
+sys.path.append(r'../../')
+import randomArbitrary
+import numpy as np
+
+
+def traceCalls(f, calls):
+    '''Call f() `calls` times. Return (seconds, peak traced bytes)'''
+    f() #warm up
+    tracemalloc.start()
+    t0 = time.time()
+    for i in range(calls): #@UnusedVariable
+        f()
+    elapsed = time.time() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+if __name__ == '__main__':
+    n = 10 ** 4
+    calls = 1000
+    if len(sys.argv) > 1:
+        n = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        calls = int(sys.argv[2])
+    x = np.arange(1000)
+    p = np.exp(np.random.randn(len(x)))
+    samplers = (('float', randomArbitrary.RandomArbitrary(x, p), float),
+                ('integer', randomArbitrary.RandomArbitraryInteger(x, p),
+                 np.int64))
+    print('%8s %12s %10s %12s' % ('sampler', 'method', 'seconds',
+                                  'peak bytes'))
+    for name, sampler, dtype in samplers:
+        out = np.empty(n, dtype=dtype)
+        for method, f in (('random', lambda: sampler.random(n)),
+                          ('random_into', lambda: sampler.random_into(out))):
+            elapsed, peak = traceCalls(f, calls)
+            print('%8s %12s %10.4f %12d' % (name, method, elapsed, peak))
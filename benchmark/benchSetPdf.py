@@ -0,0 +1,34 @@
+'''Construction time of RandomArbitraryInteger tables as a function of the
+support size. The time per bin should stay roughly constant.
+
+Usage: python benchSetPdf.py [maxPower]
+'''
+import sys
+import time
+sys.path.append(r'../../')
+import randomArbitrary
+import numpy as np
+
+
+def benchSetPdf(nBins, repeats=3):
+    '''Return the best of `repeats` set_pdf timings for `nBins` bins'''
+    x = np.arange(nBins)
+    p = np.exp(np.random.randn(nBins))
+    rng = randomArbitrary.RandomArbitraryInteger([0])
+    best = np.inf
+    for r in range(repeats): #@UnusedVariable
+        t0 = time.time()
+        rng.set_pdf(x, p)
+        best = min(best, time.time() - t0)
+    return best
+
+
+if __name__ == '__main__':
+    maxPower = 7
+    if len(sys.argv) > 1:
+        maxPower = int(sys.argv[1])
+    print('%10s %12s %14s' % ('bins', 'seconds', 'ns per bin'))
+    for power in range(3, maxPower + 1):
+        nBins = 10 ** power
+        t = benchSetPdf(nBins)
+        print('%10d %12.4f %14.1f' % (nBins, t, t / nBins * 1e9))
@@ -0,0 +1,178 @@
+'''Benchmark suite of RandomArbitrary and RandomArbitraryInteger.
+
+For every support size (and every Nrl of the 'table' mode of RandomArbitrary)
+the suite measures
+    buildSeconds: best set_pdf time
+    scalarPerSecond: random() calls per second
+    bulkPerSecond: values per second drawn by random(n)
+    buildPeakBytes, bulkPeakBytes: peak memory traced by tracemalloc while
+        set_pdf and random(n) run
+    accuracy: Kolmogorov-Smirnov statistic of the sample against the
+        requested cdf (RandomArbitrary) or the total variation distance of the
+        sample frequencies from the requested pdf (RandomArbitraryInteger).
+        Smaller is better; both include the sampling noise of n values
+
+The results are written as JSON, so the runs of different versions can be
+compared with --compare.
+
+Usage: python suite.py [--quick] [--output results.json]
+       python suite.py --compare old.json new.json
+'''
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+sys.path.append(r'../../')
+import randomArbitrary
+import numpy as np
+
+SIZES = (10 ** 2, 10 ** 4, 10 ** 6)
+NRLS = (10 ** 3, 10 ** 5)
+QUICK_SIZES = (10 ** 2, 10 ** 4)
+QUICK_NRLS = (10 ** 3, )
+BULK = 10 ** 6
+SCALAR_CALLS = 10 ** 4
+#larger is better for these metrics, smaller for the rest
+HIGHER_IS_BETTER = ('scalarPerSecond', 'bulkPerSecond')
+
+
+def bestTime(f, repeats=3):
+    '''Return the best of `repeats` timings of f()'''
+    best = np.inf
+    for r in range(repeats): #@UnusedVariable
+        t0 = time.perf_counter()
+        f()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def peakBytes(f):
+    '''Return the peak memory traced while f() runs'''
+    tracemalloc.start()
+    try:
+        f()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def measure(rng, setPdf, bulk, scalarCalls):
+    '''Return the timings and memory of the sampler `rng`
+
+    @param setPdf: function that calls rng.set_pdf with the benchmark pdf
+    @return: (dict of metrics, sample of `bulk` values)
+    '''
+    def scalarLoop():
+        for i in range(scalarCalls): #@UnusedVariable
+            rng.random()
+    theSample = rng.random(bulk)
+    result = {
+        'buildSeconds': bestTime(setPdf),
+        'scalarPerSecond': scalarCalls / bestTime(scalarLoop),
+        'bulkPerSecond': bulk / bestTime(lambda: rng.random(bulk)),
+        'buildPeakBytes': peakBytes(setPdf),
+        'bulkPeakBytes': peakBytes(lambda: rng.random(bulk)),
+    }
+    return result, theSample
+
+
+def benchFloat(size, mode, Nrl, bulk, scalarCalls):
+    '''Benchmark RandomArbitrary on a narrow peak, hard for coarse tables'''
+    x = np.linspace(-1.0, 1.0, size)
+    p = np.exp(-x ** 2 / 0.02)
+    p[0] = 0.0
+    rng = randomArbitrary.RandomArbitrary(x, p, Nrl=Nrl or 1000, mode=mode,
+                                          seed=0)
+    result, theSample = measure(rng, lambda: rng.set_pdf(x, p), bulk,
+                                scalarCalls)
+    cdf = np.cumsum(p) / np.sum(p)
+    theSample.sort()
+    ecdf = np.arange(1, bulk + 1) / float(bulk)
+    result['accuracy'] = float(np.max(np.abs(np.interp(theSample, x, cdf) -
+                                             ecdf)))
+    result.update(sampler='RandomArbitrary', size=size, mode=mode, Nrl=Nrl)
+    return result
+
+
+def benchInteger(size, bulk, scalarCalls):
+    '''Benchmark RandomArbitraryInteger on a heavy-tailed pdf'''
+    x = np.arange(size)
+    p = np.random.default_rng(0).lognormal(0.0, 2.0, size)
+    rng = randomArbitrary.RandomArbitraryInteger(x, p, seed=0)
+    result, theSample = measure(rng, lambda: rng.set_pdf(x, p), bulk,
+                                scalarCalls)
+    observed = np.bincount(theSample, minlength=size) / float(bulk)
+    result['accuracy'] = float(0.5 * np.abs(observed - p / p.sum()).sum())
+    result.update(sampler='RandomArbitraryInteger', size=size, mode='alias',
+                  Nrl=None)
+    return result
+
+
+def runSuite(sizes, nrls, bulk=BULK, scalarCalls=SCALAR_CALLS):
+    '''Run all the benchmarks. Return the list of results'''
+    results = []
+    for size in sizes:
+        for Nrl in nrls:
+            results.append(benchFloat(size, 'table', Nrl, bulk, scalarCalls))
+        results.append(benchFloat(size, 'exact', None, bulk, scalarCalls))
+        results.append(benchInteger(size, bulk, scalarCalls))
+    return results
+
+
+def resultKey(result):
+    return (result['sampler'], result['size'], result['mode'], result['Nrl'])
+
+
+def compare(old, new):
+    '''Print the ratios new / old of the metrics of two suite runs'''
+    oldResults = dict((resultKey(r), r) for r in old['results'])
+    metrics = HIGHER_IS_BETTER + ('buildSeconds', 'buildPeakBytes',
+                                  'bulkPeakBytes', 'accuracy')
+    print('%-24s %8s %8s %7s ' % ('sampler', 'size', 'mode', 'Nrl') +
+          ' '.join('%15s' % m for m in metrics))
+    for r in new['results']:
+        o = oldResults.get(resultKey(r))
+        if o is None:
+            continue
+        ratios = []
+        for m in metrics:
+            ratios.append('%15.2f' % (r[m] / o[m]) if o[m] else '%15s' % '-')
+        print('%-24s %8d %8s %7s ' % (r['sampler'], r['size'], r['mode'],
+                                      r['Nrl'] or '-') + ' '.join(ratios))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Benchmark the samplers and write the results as JSON')
+    parser.add_argument('--quick', action='store_true',
+                        help='small sizes only, for a smoke test')
+    parser.add_argument('--output', help='JSON file (default: stdout)')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'),
+                        help='print the ratios of the metrics of two runs')
+    args = parser.parse_args()
+    if args.compare:
+        with open(args.compare[0]) as f:
+            old = json.load(f)
+        with open(args.compare[1]) as f:
+            new = json.load(f)
+        compare(old, new)
+        sys.exit(0)
+
+    if args.quick:
+        results = runSuite(QUICK_SIZES, QUICK_NRLS, bulk=10 ** 5,
+                           scalarCalls=10 ** 3)
+    else:
+        results = runSuite(SIZES, NRLS)
+    report = {'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+              'python': platform.python_version(),
+              'numpy': np.__version__,
+              'machine': platform.machine(),
+              'results': results}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=1, sort_keys=True)
+    else:
+        json.dump(report, sys.stdout, indent=1, sort_keys=True)
+        print()
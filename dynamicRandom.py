@@ -0,0 +1,145 @@
+import numpy as np
+
+issortedAndUnique = lambda l: np.all(np.diff(l) > 0)
+
+
+class RandomArbitraryIntegerDynamic():
+    '''Random integer numbers from an arbitrary distribution whose weights
+    change over time.
+
+    The weights are kept in the leaves of a complete binary sum tree, where
+    every inner node holds the sum of its children. `update` changes one
+    weight and the sums on its path to the root in O(log n), and sampling
+    descends from the root in O(log n), for all the requested numbers at
+    once. Use RandomArbitraryInteger when the weights rarely change: its
+    alias table samples in O(1).
+    '''
+    def __init__(self, x, p=None, seed=None):
+        '''Initialize the object
+
+        @param x: sorted unique integers that will be used by the generator
+        @param p: weights (probability density profile) of the values.
+            If None (default) every value in `x` will have the same weight
+        @param seed: None, an int, a numpy.random.SeedSequence, BitGenerator or
+            Generator. Anything numpy.random.default_rng accepts
+        '''
+        if p is None:
+            p = [1.0, ] * len(x)
+        assert len(x) == len(p)
+        self._rng = np.random.default_rng(seed)
+        self.set_pdf(x, p)
+
+    def set_pdf(self, x, p):
+        '''Set the values and all their weights, rebuilding the tree'''
+        assert len(x) == len(p)
+        x = np.asarray(x).astype(np.int64)
+        assert issortedAndUnique(x)
+        p = np.asarray(p, dtype=float)
+        if np.any(p < 0):
+            raise ValueError('Negative PDF values are not allowed')
+        if p.sum() == 0:
+            raise ValueError('At least one non-zero PDF value is required')
+
+        n = len(x)
+        capacity = 1
+        depth = 0
+        while capacity < n:
+            capacity *= 2
+            depth += 1
+        tree = np.zeros(2 * capacity)
+        tree[capacity:capacity + n] = p
+        level = capacity
+        while level > 1:
+            tree[level // 2:level] = tree[level:2 * level:2] + \
+                tree[level + 1:2 * level:2]
+            level //= 2
+        self._values = x
+        self._capacity = capacity
+        self._depth = depth
+        self._tree = tree
+
+    def update(self, value, weight):
+        '''Set the weight of one of the values in O(log n)
+
+        @param value: one of the values given to set_pdf
+        @param weight: its new non-negative weight
+        '''
+        if weight < 0:
+            raise ValueError('Negative PDF values are not allowed')
+        idx = int(np.searchsorted(self._values, value))
+        if idx == len(self._values) or self._values[idx] != value:
+            raise ValueError('%r is not one of the values of the distribution'
+                             % (value, ))
+        tree = self._tree
+        i = self._capacity + idx
+        tree[i] = weight
+        i //= 2
+        while i >= 1:
+            #recompute instead of adding the difference: no drift
+            tree[i] = tree[2 * i] + tree[2 * i + 1]
+            i //= 2
+
+    def weight(self, value):
+        '''Return the current weight of `value`'''
+        idx = int(np.searchsorted(self._values, value))
+        if idx == len(self._values) or self._values[idx] != value:
+            raise ValueError('%r is not one of the values of the distribution'
+                             % (value, ))
+        return self._tree[self._capacity + idx]
+
+    def random(self, n=None, asList=False):
+        '''Return random number or numbers
+
+        @param n: amount of random values to return or None
+        @param asList: if True, return a list instead of a numpy array
+        @return: if n is None: return a scalar, if n>=1 return a numpy array
+            (or a list if `asList` is True) with n elements, else raise an
+            exception
+        '''
+        if self._tree[1] <= 0:
+            raise ValueError('At least one non-zero PDF value is required')
+        if n is None:
+            return self._randOne()
+        else:
+            assert n > 0
+            ret = self._randN(n)
+            if asList:
+                ret = ret.tolist()
+            return ret
+
+    def _randOne(self):
+        '''Return a single random number'''
+        tree = self._tree
+        u = self._rng.random() * tree[1]
+        i = 1
+        while i < self._capacity:
+            left = 2 * i
+            #never descend into an empty subtree, even due to rounding errors
+            if u >= tree[left] and tree[left + 1] > 0:
+                u -= tree[left]
+                i = left + 1
+            else:
+                i = left
+        return self._values[i - self._capacity]
+
+    def _randN(self, n):
+        '''Return a numpy array of n random numbers
+
+        All the numbers descend the tree together, one level at a time.
+        '''
+        tree = self._tree
+        u = self._rng.random(n) * tree[1]
+        i = np.ones(n, dtype=np.intp)
+        goRight = np.empty(n, dtype=bool)
+        for level in range(self._depth): #@UnusedVariable
+            i *= 2
+            leftSum = tree[i]
+            np.greater_equal(u, leftSum, out=goRight)
+            goRight &= tree[i + 1] > 0
+            np.subtract(u, leftSum, out=u, where=goRight)
+            i += goRight
+        return self._values[i - self._capacity]
+
+
+if __name__ == '__main__':
+    pass
@@ -1,7 +1,39 @@
+import copy
+import threading
 import numpy as np
 
+from .rngStreams import spawnGenerators
+from .parallel import randomParallel
+from .persistence import saveTables, loadTables
+from .streaming import CHUNK_SIZE, iterChunks, aiterChunks
+from .histogram import histogramFromSamples
+from .uniforms import makeUniforms
+from .instrumentation import Instrumentation, instrument
+
+
+issortedAndUnique = lambda l: np.all(np.diff(l) > 0)
+
+TABLE_DTYPES = ('float64', 'float32')
+
+
+def _inverseCdf(x, cdf, y):
+    '''Piecewise linear inverse of `cdf` evaluated at `y`
+
+    The result is interpolated between the first cdf value that is >= y and
+    the one before it. Values of y below cdf[0] map to x[0]
+
+    @param x: sorted float array of the random variate values
+    @param cdf: cumulative pdf at `x`
+    @param y: array of values between 0 and 1
+    '''
+    hi = np.searchsorted(cdf, y, side='left')
+    np.minimum(hi, len(x) - 1, out=hi)
+    lo = np.maximum(hi - 1, 0)
+    dCdf = cdf[hi] - cdf[lo]
+    frac = np.zeros(len(y))
+    np.divide(y - cdf[lo], dCdf, out=frac, where=dCdf > 0)
+    return x[lo] + (x[hi] - x[lo]) * frac
 
-issortedAndUnique = lambda l: np.all([l[i] < l[i+1] for i in xrange(len(l)-1)])
 
 class RandomArbitrary:
     """This class enables us to generate random numbers with an arbitrary
@@ -10,32 +42,98 @@ class RandomArbitrary:
     Based on a code by  Kaushik Ghose, copied on Dec 6 2011
     http://code.activestate.com/recipes/576556/ Used under the MIT license
     """
+    _SAVED_SCALARS = ('mode', 'Nrl', 'inversecdfbins', 'tableDtype')
+    _SAVED_ARRAYS = ('x', 'pdf', 'cdf', 'inversecdf', 'delta_inversecdf')
+    tableDtype = 'float64' #default of tables saved without it
+    _instrumentation = None #see enable_instrumentation
 
-    def __init__(self, x=np.arange(0.0, 1.0, .01), p=None, Nrl=1000):
+    def __init__(self, x=np.arange(0.0, 1.0, .01), p=None, Nrl=1000,
+                 mode='table', seed=None, uniforms='pseudo',
+                 tableDtype='float64'):
         """Initialize the lookup table (with default values if necessary)
         @param x: random number values
         @param p: probability density profile at that point
         @param Nrl: number of reverse look up values between 0 and 1
+        @param mode: 'table' (default) samples through the `Nrl`-bin inverse
+            look up table. 'exact' bisects the cdf for every sample, which
+            is exact for the given pdf and needs no look up table
+        @param seed: None, an int, a numpy.random.SeedSequence, BitGenerator or
+            Generator. Anything numpy.random.default_rng accepts
+        @param uniforms: 'pseudo' (default) for i.i.d. uniform variates, or
+            'stratified', 'sobol' or 'halton' for variance reduction (see
+            uniforms.QuasiUniforms)
+        @param tableDtype: 'float64' (default) or 'float32' storage of the
+            inverse look up table. float32 halves the memory of the table;
+            the values are rounded to 24 significant bits, i.e. they are off
+            by up to 6e-8 * max(abs(x)), which is well below the resolution
+            of the table unless Nrl is in the millions or the range of x is
+            far from 0 relative to its width
 
         """
-        if p == None:
+        if p is None:
             p = np.ones(len(x))
         assert len(x) == len(p)
+        self._rng = np.random.default_rng(seed)
+        self.uniforms = uniforms
+        self._quasi = makeUniforms(uniforms, self._rng)
+        self._frozen = False
         self.Nrl = Nrl
+        self.mode = mode
+        self.tableDtype = tableDtype
         self.set_pdf(x, p)
 
-    def set_pdf(self, x, p, Nrl=None):
+    @classmethod
+    def from_samples(cls, data, bins=1000, valueRange=None, **kwargs):
+        """Return a generator that follows the histogram of raw samples
+
+        The histogram is built in a single streaming pass with bounded memory
+        (see histogram.histogramFromSamples), and the values are spread
+        uniformly within every bin.
+
+        @param data: numpy array, memory-mapped array or iterable of arrays
+        @param bins: number of histogram bins
+        @param valueRange: (lo, hi) of the histogram. Required for iterables
+        @param kwargs: passed to __init__ (Nrl, mode, seed)
+        """
+        hist = histogramFromSamples(data, bins, valueRange)
+        return cls.from_histogram(hist, **kwargs)
+
+    @classmethod
+    def from_histogram(cls, hist, **kwargs):
+        """Return a generator that follows a StreamingHistogram
+
+        Use this with histograms merged from several processes.
+
+        @param kwargs: passed to __init__ (Nrl, mode, seed)
+        """
+        x, p = hist.pdf()
+        return cls(x, p, **kwargs)
+
+    def set_pdf(self, x, p, Nrl=None, mode=None, tableDtype=None):
         """Generate the lookup tables.
         x is the value of the random variate
         pdf is its probability density
         cdf is the cumulative pdf
-        inversecdf is the inverse look up table
+        inversecdf is the inverse look up table (in the 'table' mode only)
 
         """
 
+        if self._frozen:
+            raise ValueError('The pdf of a frozen sampler cannot be changed')
         assert len(x) == len(p)
         assert issortedAndUnique(x)
-        self.x = x
+        if mode is None:
+            mode = self.mode
+        if mode not in ('table', 'exact'):
+            raise ValueError('Unknown sampling mode %r' % (mode, ))
+        self.mode = mode
+        if tableDtype is None:
+            tableDtype = self.tableDtype
+        if tableDtype not in TABLE_DTYPES:
+            raise ValueError('Unknown table dtype %r' % (tableDtype, ))
+        self.tableDtype = tableDtype
+        self._scratchBuffers = threading.local()
+        self.x = np.array(x, dtype=float)
         if Nrl is None:
             Nrl = self.Nrl
 
@@ -49,34 +147,242 @@ class RandomArbitrary:
         self.cdf = self.pdf.cumsum()
         self.inversecdfbins = Nrl
         self.Nrl = Nrl
+        if mode == 'exact':
+            self.inversecdf = None
+            self.delta_inversecdf = None
+            return
         y = np.arange(Nrl) / float(Nrl)
-        self.inversecdf = np.zeros(Nrl)
-        self.inversecdf[0] = self.x[0]
-        cdf_idx = 0
-        for n in xrange(1, self.inversecdfbins):
-            while self.cdf[cdf_idx] < y[n] and cdf_idx < Nrl:
-                cdf_idx += 1
-            self.inversecdf[n] = self.x[cdf_idx - 1] + (self.x[cdf_idx] - self.x[cdf_idx - 1]) * (y[n] - self.cdf[cdf_idx - 1]) / (self.cdf[cdf_idx] - self.cdf[cdf_idx - 1])
-            if cdf_idx >= Nrl:
-                break
-        self.delta_inversecdf = np.concatenate((np.diff(self.inversecdf), [0]))
-
-    def random(self, n=None):
+        inversecdf = _inverseCdf(self.x, self.cdf, y)
+        delta = np.concatenate((np.diff(inversecdf), [0]))
+        self.inversecdf = inversecdf.astype(tableDtype)
+        self.delta_inversecdf = delta.astype(tableDtype)
+
+    def random(self, n=None, lo=None, hi=None):
         """Give us N random numbers with the requested distribution
 
         @param n: amount of random values to return or None
+        @param lo, hi: if any of them is given, sample from the distribution
+            truncated to [lo, hi] (see _randTruncated)
         @return: if n is None: return a scalar, if n>=1 return a list with n
             elements, else raise an exception
         """
-        idx_f = np.random.uniform(size=n, high=self.Nrl - 1)
-        idx = np.array([idx_f], 'i').reshape(-1)
-        y = self.inversecdf[idx] + (idx_f - idx) * self.delta_inversecdf[idx]
+        if lo is not None or hi is not None:
+            return self._randTruncated(n, lo, hi)
+        if n is None:
+            size = 1
+        else:
+            size = n
+        y = np.empty(size)
+        self._fill(y, self._scratch(size, cached=False))
+        if n is None:
+            y = y[0]
+        return y
+
+    def random_into(self, out):
+        """Fill `out` with random numbers with the requested distribution
+
+        Internal scratch buffers are kept between the calls, so in the 'table'
+        mode repeated calls with the same size do not allocate memory. The
+        'exact' mode allocates temporaries in np.searchsorted.
+
+        @param out: writable numpy array of any shape (including views), or an
+            object that exposes a writable buffer, e.g. a memoryview
+        @return: out
+        """
+        target = np.asarray(out)
+        self._fill(target, self._scratch(target.size, cached=True))
+        return out
+
+    def random_parallel(self, n, workers=None):
+        """Return a numpy array of n random numbers drawn by several threads
+
+        @param n: amount of random values to return
+        @param workers: number of threads. None (default) means one per CPU
+        """
+        return randomParallel(self, n, float, workers)
+
+    def iter_chunks(self, chunkSize=CHUNK_SIZE, prefetch=False):
+        """Yield numpy arrays of `chunkSize` random numbers, endlessly
+
+        @param prefetch: if True, a background thread generates the next chunk
+            while the current one is processed
+        """
+        return iterChunks(self, chunkSize, prefetch)
 
+    def aiter_chunks(self, chunkSize=CHUNK_SIZE, executor=None):
+        """Asynchronous version of iter_chunks for asyncio event loops
+
+        @param executor: concurrent.futures executor that generates the chunks.
+            If None, the default executor of the event loop is used
+        """
+        return aiterChunks(self, chunkSize, executor)
+
+    def __iter__(self):
+        return self.iter_chunks()
+
+    def __aiter__(self):
+        return self.aiter_chunks()
+
+    def __getstate__(self):
+        """Pickle (and deep-copy) without the thread-local scratch buffers"""
+        state = self.__dict__.copy()
+        state.pop('_scratchBuffers', None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._scratchBuffers = threading.local()
+
+    def spawn(self, k):
+        """Return k samplers with statistically independent random streams
+
+        The children share the look up tables of this object.
+        """
+        ret = []
+        for generator in spawnGenerators(self._rng, k):
+            child = copy.copy(self)
+            child._rng = generator
+            child._quasi = makeUniforms(self.uniforms, generator)
+            child._scratchBuffers = threading.local()
+            instrument(child, self._instrumentation)
+            ret.append(child)
+        return ret
+
+    def save(self, path):
+        """Save the tables to the directory `path` (see persistence.saveTables)
+        """
+        saveTables(path, self, self._SAVED_SCALARS, self._SAVED_ARRAYS)
+
+    @classmethod
+    def load(cls, path, mmap=True, seed=None):
+        """Return a sampler with the tables saved in the directory `path`
+
+        @param mmap: if True (default) the tables are memory-mapped read-only
+            and shared between the processes that load them
+        @param seed: see __init__
+        """
+        obj = cls.__new__(cls)
+        loadTables(path, obj, mmap)
+        obj._rng = np.random.default_rng(seed)
+        obj.uniforms = 'pseudo'
+        obj._quasi = None
+        obj._scratchBuffers = threading.local()
+        obj._frozen = False
+        return obj
+
+    def freeze(self):
+        """Make the tables read-only. set_pdf raises ValueError afterwards"""
+        for name in self._SAVED_ARRAYS:
+            value = getattr(self, name)
+            if value is not None:
+                value.flags.writeable = False
+        self._frozen = True
+
+    def enable_instrumentation(self, callback=None):
+        """Start recording the builds and the samples of this sampler
+
+        set_pdf, random and random_into calls are timed and counted (see
+        instrumentation.Instrumentation). Children spawned afterwards share
+        the counters.
+
+        @param callback: see instrumentation.Instrumentation
+        @return: the Instrumentation object
+        """
+        instrument(self, Instrumentation(callback))
+        return self._instrumentation
+
+    def disable_instrumentation(self):
+        """Stop recording. Disabled instrumentation has no overhead"""
+        instrument(self, None)
+
+    def stats(self):
+        """Return the recorded counters (see Instrumentation.stats), or None
+        if the instrumentation is disabled
+        """
+        if self._instrumentation is None:
+            return None
+        return self._instrumentation.stats()
+
+    def _randTruncated(self, n, lo, hi):
+        """Random numbers from the distribution truncated to [lo, hi]
+
+        The uniform variates are mapped into [cdf(lo), cdf(hi)] and then
+        through the exact inverse of the stored cdf (in both modes), so no
+        tables are rebuilt and no samples are rejected.
+        """
+        x = self.x
+        if lo is None or lo <= x[0]:
+            cdfLo = 0.0 #include the point mass at x[0]
+        else:
+            cdfLo = np.interp(lo, x, self.cdf)
+        if hi is None:
+            cdfHi = self.cdf[-1]
+        else:
+            cdfHi = np.interp(hi, x, self.cdf, 0.0)
+        if not cdfHi > cdfLo:
+            raise ValueError('The distribution has no mass in [%r, %r]' % (
+                lo, hi))
+        u = self._uniforms(np.empty(1 if n is None else n))
+        u *= cdfHi - cdfLo
+        u += cdfLo
+        y = _inverseCdf(x, self.cdf, u)
+        np.clip(y, lo, hi, out=y) #rounding errors
         if n is None:
             y = y[0]
         return y
 
+    def _uniforms(self, u):
+        """Fill the float array `u` with uniform variates in [0, 1)"""
+        if self._quasi is None:
+            self._rng.random(out=u)
+        else:
+            self._quasi.fill(u)
+        return u
 
+    def _scratch(self, n, cached):
+        """Return buffers for _fill, reusing the previous ones if cached
+
+        The cached buffers are thread-local, so threads can share a sampler
+        (e.g. one from a SamplerCache).
+        """
+        previous = getattr(self._scratchBuffers, 'buffers', None)
+        if cached and previous is not None and len(previous[0]) >= n:
+            return [b[:n] for b in previous]
+        if self.mode == 'exact':
+            buffers = (np.empty(n), )
+        else:
+            delta = np.empty(n)
+            if self.inversecdf.dtype == delta.dtype:
+                table = delta
+            else:
+                table = np.empty(n, dtype=self.inversecdf.dtype)
+            buffers = (np.empty(n), np.empty(n, dtype=np.intp), delta, table)
+        if cached:
+            self._scratchBuffers.buffers = buffers
+        return buffers
+
+    def _fill(self, target, buffers):
+        """Fill the array `target` with random numbers
+
+        @param buffers: arrays returned by _scratch, with target.size elements.
+            In the 'table' mode: (u, idx, delta, table), where table has the
+            dtype of the tables and may be the same array as delta
+        """
+        u = self._uniforms(buffers[0])
+        if self.mode == 'exact':
+            y = _inverseCdf(self.x, self.cdf, u)
+            np.copyto(target, y.reshape(target.shape))
+            return
+        idx, delta, table = buffers[1:]
+        u *= self.Nrl - 1
+        np.floor(u, out=delta)
+        u -= delta
+        np.copyto(idx, delta, casting='unsafe')
+        #mode='clip' lets np.take write into `out` without a temporary copy
+        np.take(self.delta_inversecdf, idx, out=table, mode='clip')
+        u *= table
+        np.take(self.inversecdf, idx, out=table, mode='clip')
+        np.add(u.reshape(target.shape), table.reshape(target.shape), out=target)
 
 
 if __name__ == '__main__':
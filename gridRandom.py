@@ -0,0 +1,83 @@
+import numpy as np
+
+from .intRandom import _buildAliasTable, _compactIndexDtype
+
+
+class RandomArbitraryGrid():
+    '''Random points from an arbitrary N-dimensional gridded distribution.
+
+    A grid cell is drawn with the alias method on the flattened grid (see
+    RandomArbitraryInteger), and the point is placed uniformly within the
+    cell. The tables are stored with compact dtypes (float32 probabilities
+    and uint16 or int32 aliases for grids of less than 2**31 cells), i.e. at
+    most 8 bytes per cell, so the tables of 10^8 cells take less than 1 GB.
+    Building them takes at most 28 more bytes per cell besides `p`, plus 8
+    for a copy of `p` unless it is a float64 array, i.e. about 3 GB at peak
+    for 10^8 cells.
+    '''
+    def __init__(self, edges, p, seed=None):
+        '''Initialize the object
+
+        @param edges: sequence of N strictly increasing arrays of bin edges,
+            one per dimension. edges[k] has p.shape[k] + 1 elements
+        @param p: N-dimensional array of non-negative cell probabilities
+            (need not be normalized)
+        @param seed: None, an int, a numpy.random.SeedSequence, BitGenerator or
+            Generator. Anything numpy.random.default_rng accepts
+        '''
+        self._rng = np.random.default_rng(seed)
+        self.set_pdf(edges, p)
+
+    def set_pdf(self, edges, p):
+        '''Set the bin edges and the cell probabilities'''
+        p = np.asarray(p)
+        if len(edges) != p.ndim:
+            raise ValueError('Need one array of bin edges per dimension of p')
+        edges = [np.asarray(e, dtype=float) for e in edges]
+        for k, e in enumerate(edges):
+            if len(e) != p.shape[k] + 1:
+                raise ValueError('Dimension %d has %d cells and %d edges' % (
+                    k, p.shape[k], len(e)))
+            if not np.all(np.diff(e) > 0):
+                raise ValueError('Bin edges must be strictly increasing')
+        flat = np.asarray(p, dtype=float).reshape(-1) #a copy only if needed
+        if np.any(flat < 0):
+            raise ValueError('Negative PDF values are not allowed')
+        if flat.sum() == 0:
+            raise ValueError('At least one non-zero PDF value is required')
+        self._prob, self._alias = _buildAliasTable(
+            flat, np.float32, _compactIndexDtype(len(flat)))
+        del flat
+        self.edges = edges
+        self.shape = p.shape
+        self._widths = [np.diff(e) for e in edges]
+        self._n = len(self._prob)
+
+    def random(self, n=None):
+        '''Return random points
+
+        @param n: amount of points to return or None
+        @return: if n is None: an array with one coordinate per dimension,
+            otherwise an (n, N) array
+        '''
+        size = 1 if n is None else n
+        u = self._rng.random(size) * self._n
+        cell = np.floor(u)
+        u -= cell
+        cell = cell.astype(np.intp)
+        np.minimum(cell, self._n - 1, out=cell) #guard against u rounding up
+        useAlias = u >= self._prob[cell]
+        cell[useAlias] = self._alias[cell[useAlias]]
+        del u, useAlias
+
+        ret = self._rng.random((size, len(self.shape)))
+        for k, idx in enumerate(np.unravel_index(cell, self.shape)):
+            ret[:, k] *= self._widths[k][idx]
+            ret[:, k] += self.edges[k][idx]
+        if n is None:
+            ret = ret[0]
+        return ret
+
+
+if __name__ == '__main__':
+    pass
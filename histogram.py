@@ -0,0 +1,95 @@
+import numpy as np
+
+CHUNK_SIZE = 2 ** 20
+
+
+class StreamingHistogram():
+    '''Histogram with fixed, equal-width bins, built from a stream of arrays.
+
+    Only the counts are kept, so memory does not depend on the amount of
+    data. Histograms with the same bins, e.g. built by several processes
+    from parts of the data, can be merged.
+    '''
+    def __init__(self, lo, hi, bins=1000):
+        '''
+        @param lo, hi: range of the histogram. Values outside it are counted
+            in `underflow` and `overflow` and otherwise ignored, as are NaNs
+        @param bins: number of bins
+        '''
+        if not hi > lo:
+            raise ValueError('The histogram range must not be empty')
+        self.edges = np.linspace(lo, hi, bins + 1)
+        self.counts = np.zeros(bins, dtype=np.int64)
+        self.underflow = 0
+        self.overflow = 0
+
+    def update(self, values):
+        '''Add the values of an array (of any shape) to the histogram'''
+        values = np.asarray(values, dtype=float).reshape(-1)
+        lo = self.edges[0]
+        hi = self.edges[-1]
+        bins = len(self.counts)
+        self.underflow += int(np.count_nonzero(values < lo))
+        self.overflow += int(np.count_nonzero(values > hi))
+        values = values[(values >= lo) & (values <= hi)] #also drops NaNs
+        idx = ((values - lo) * (bins / (hi - lo))).astype(np.intp)
+        np.minimum(idx, bins - 1, out=idx) #hi belongs to the last bin
+        self.counts += np.bincount(idx, minlength=bins)
+        return self
+
+    def merge(self, other):
+        '''Add the counts of another histogram with the same bins'''
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError('Only histograms with the same bins can be merged')
+        self.counts += other.counts
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+        return self
+
+    def __iadd__(self, other):
+        return self.merge(other)
+
+    def pdf(self):
+        '''Return (x, p) for RandomArbitrary.set_pdf
+
+        x are the bin edges and p[i] is the count of the bin that ends at
+        x[i], so that the values are spread uniformly within every bin.
+        '''
+        if self.counts.sum() == 0:
+            raise ValueError('The histogram is empty')
+        return self.edges, np.concatenate(([0.0], self.counts))
+
+
+def histogramFromSamples(data, bins=1000, valueRange=None,
+                         chunkSize=CHUNK_SIZE):
+    '''Build a StreamingHistogram from raw samples in a single streaming pass
+
+    @param data: numpy array (including np.memmap and arrays loaded with
+        np.load(..., mmap_mode='r')) or an iterable of arrays
+    @param bins: number of bins
+    @param valueRange: (lo, hi) of the histogram. Required for iterables.
+        For arrays, the range of the data is used if None, which costs an
+        extra pass
+    @param chunkSize: number of array elements processed at once. Bounds
+        the memory used for arrays
+    '''
+    if isinstance(data, np.ndarray):
+        flat = data.reshape(-1)
+        if valueRange is None:
+            lo = np.inf
+            hi = -np.inf
+            for start in range(0, len(flat), chunkSize):
+                chunk = flat[start:start + chunkSize]
+                lo = min(lo, np.nanmin(chunk))
+                hi = max(hi, np.nanmax(chunk))
+            valueRange = (lo, hi)
+        chunks = (flat[start:start + chunkSize]
+                  for start in range(0, len(flat), chunkSize))
+    elif valueRange is None:
+        raise ValueError('valueRange is required when data is not an array')
+    else:
+        chunks = data
+    hist = StreamingHistogram(valueRange[0], valueRange[1], bins)
+    for chunk in chunks:
+        hist.update(chunk)
+    return hist
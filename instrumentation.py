@@ -0,0 +1,119 @@
+import functools
+import threading
+import time
+
+
+class Instrumentation():
+    '''Thread-safe counters of the builds and the samples of a sampler.
+
+    Samplers record into an Instrumentation object only when it is enabled
+    (see `instrument`). Children returned by `spawn`, including the workers
+    of `random_parallel`, share the object of their parent, so the counters
+    cover all of them and the sampling time is summed over the threads.
+    '''
+    def __init__(self, callback=None):
+        '''
+        @param callback: None or a function called after every recorded event
+            as callback(event, n, seconds), where event is 'build' or
+            'sample', n is the number of samples (None for builds) and
+            seconds is the duration of the call
+        '''
+        self.callback = callback
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        '''Zero all the counters'''
+        with self._lock:
+            self._builds = 0
+            self._buildSeconds = 0.0
+            self._lastBuildSeconds = None
+            self._samples = 0
+            self._sampleCalls = 0
+            self._sampleSeconds = 0.0
+            self._batchSizes = {}
+
+    def record(self, event, n, seconds):
+        '''Record a 'build' or a 'sample' call that took `seconds`'''
+        with self._lock:
+            if event == 'build':
+                self._builds += 1
+                self._buildSeconds += seconds
+                self._lastBuildSeconds = seconds
+            else:
+                self._samples += n
+                self._sampleCalls += 1
+                self._sampleSeconds += seconds
+                bucket = 1 << (max(n, 1).bit_length() - 1)
+                self._batchSizes[bucket] = self._batchSizes.get(bucket, 0) + 1
+        if self.callback is not None:
+            self.callback(event, n, seconds)
+
+    def stats(self):
+        '''Return a dict with the counters
+
+        builds, buildSeconds, lastBuildSeconds: number of set_pdf calls,
+            their total and their last duration
+        samples, sampleCalls, sampleSeconds: number of samples, number of
+            sampling calls and their total duration
+        batchSizes: histogram of the number of samples per call. Maps a
+            power of two b to the number of calls with b to 2*b - 1 samples
+        '''
+        with self._lock:
+            return {'builds': self._builds,
+                    'buildSeconds': self._buildSeconds,
+                    'lastBuildSeconds': self._lastBuildSeconds,
+                    'samples': self._samples,
+                    'sampleCalls': self._sampleCalls,
+                    'sampleSeconds': self._sampleSeconds,
+                    'batchSizes': dict(self._batchSizes)}
+
+
+def _sampleCount(ret):
+    '''Return the number of samples in the value returned by a sampler'''
+    if isinstance(ret, list):
+        return len(ret)
+    size = getattr(ret, 'size', None)
+    if size is not None:
+        return int(size)
+    if isinstance(ret, memoryview):
+        return ret.nbytes // ret.itemsize
+    return 1
+
+
+#methods of the samplers that are recorded, and their events
+INSTRUMENTED_METHODS = (('set_pdf', 'build'), ('random', 'sample'),
+                        ('random_into', 'sample'))
+
+
+def instrument(sampler, instrumentation):
+    '''Make `sampler` record its builds and samples into `instrumentation`
+
+    The methods in INSTRUMENTED_METHODS are shadowed by timed wrappers in the
+    instance dict, so the methods of the class are untouched and a sampler
+    without instrumentation has no overhead at all. Copies of the sampler
+    must be instrumented again, because the wrappers are bound to it.
+
+    @param instrumentation: Instrumentation object, or None to remove the
+        wrappers
+    '''
+    sampler._instrumentation = instrumentation
+    for name, event in INSTRUMENTED_METHODS:
+        if instrumentation is None:
+            sampler.__dict__.pop(name, None)
+        else:
+            method = getattr(type(sampler), name).__get__(sampler)
+            setattr(sampler, name, _timed(method, event, instrumentation))
+
+
+def _timed(method, event, instrumentation):
+    '''Return a wrapper of `method` that records `event` calls'''
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        t0 = time.perf_counter()
+        ret = method(*args, **kwargs)
+        seconds = time.perf_counter() - t0
+        n = None if event == 'build' else _sampleCount(ret)
+        instrumentation.record(event, n, seconds)
+        return ret
+    return wrapper
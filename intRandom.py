@@ -1,8 +1,244 @@
-import random
+import copy
 import math
+import threading
 import numpy as np
 
-issortedAndUnique = lambda l: np.all([l[i] < l[i+1] for i in xrange(len(l)-1)])
+from .rngStreams import spawnGenerators
+from .parallel import randomParallel
+from .persistence import saveTables, loadTables
+from .streaming import CHUNK_SIZE, iterChunks, aiterChunks
+from .uniforms import makeUniforms
+from .instrumentation import Instrumentation, instrument
+
+issortedAndUnique = lambda l: np.all(np.diff(l) > 0)
+
+TABLE_DTYPES = ('float64', 'float32', 'fixed')
+_FIXED_SCALE = 2.0 ** 32
+_BUILD_BLOCK = 2 ** 16 #columns paired at once by _buildAliasTable
+
+
+def _compactIndexDtype(n):
+    '''Return the smallest integer dtype that can index n entries'''
+    if n <= 2 ** 16:
+        return np.uint16
+    if n <= np.iinfo(np.int32).max:
+        return np.int32
+    return np.int64
+
+
+def _compactTable(prob, alias, tableDtype):
+    '''Return the alias table (prob, alias) stored compactly
+
+    The probabilities are stored as `tableDtype`, the aliases as the
+    smallest integer dtype that fits the table. 'fixed' stores
+    round(prob * 2**32) as uint32, capped at 2**32 - 1, so a column rounded
+    up to a full one still picks its alias with probability 2**-32. Such
+    columns are made their own aliases.
+    '''
+    alias = alias.astype(_compactIndexDtype(len(alias)))
+    if tableDtype == 'float64':
+        return prob, alias
+    if tableDtype == 'float32':
+        return prob.astype(np.float32), alias
+    fixed = np.rint(prob * _FIXED_SCALE)
+    full = fixed >= _FIXED_SCALE
+    alias[full] = np.flatnonzero(full)
+    np.minimum(fixed, _FIXED_SCALE - 1, out=fixed)
+    return fixed.astype(np.uint32), alias
+
+
+def _pdfIntegerWeights(p, total):
+    '''Return int64 weights proportional to the pdf `p` that sum to exactly
+    `total`, the same as _integerWeights for a single pdf
+    '''
+    x = p / p.max()
+    x *= total / np.add.reduceat(x, [0])[0] #the sequential sum of the batch
+    np.floor(x, out=x)
+    w = x.astype(np.int64)
+    del x
+    residual = total - int(w.sum())
+    if residual < 0:
+        w[np.argmax(w)] += residual
+        residual = 0
+    positive = p > 0
+    quotient, remainder = divmod(residual, int(np.count_nonzero(positive)))
+    if remainder:
+        #one more unit to the first values that rounded down to zero, then
+        #to the first of the others
+        tiny = np.flatnonzero(positive & (w == 0))[:remainder]
+        rest = np.flatnonzero(positive & (w > 0))[:remainder - len(tiny)]
+        w[tiny] += 1
+        w[rest] += 1
+    if quotient:
+        np.add(w, quotient, out=w, where=positive)
+    return w
+
+
+def _buildAliasTable(p, probDtype=float, aliasDtype=np.intp):
+    '''Build Vose's alias table for the (not necessarily normalized) pdf `p`
+
+    Builds the same table as _buildAliasTables(p, [len(p)]), without its
+    per-value segment arrays. The weights are released as soon as the
+    cumulative sums are known, and the searches run in blocks of
+    _BUILD_BLOCK columns, so besides the pdf and the returned tables the
+    build needs at most 24 bytes per value.
+
+    @param p: array of non-negative pdf values with a positive sum
+    @param probDtype, aliasDtype: dtypes of the returned arrays
+    @return: (prob, alias) numpy arrays of length len(p)
+    '''
+    p = np.asarray(p, dtype=float)
+    n = len(p)
+    height = 2 ** 62 // n
+    w = _pdfIntegerWeights(p, n * height)
+    prob = np.empty(n, dtype=probDtype)
+    np.divide(w, float(height), out=prob, casting='unsafe')
+    np.minimum(prob, 1.0, out=prob)
+    isSmall = w <= height
+    small = np.flatnonzero(isSmall)
+    np.logical_not(isSmall, out=isSmall)
+    large = np.flatnonzero(isSmall)
+    del isSmall
+    alias = None
+    if len(large):
+        cumDeficit = w[small]
+        np.subtract(height, cumDeficit, out=cumDeficit)
+        np.cumsum(cumDeficit, out=cumDeficit)
+        cumSurplus = w[large]
+        cumSurplus -= height
+        np.cumsum(cumSurplus, out=cumSurplus)
+    del w
+    alias = np.arange(n, dtype=aliasDtype)
+    if len(large) == 0:
+        return prob, alias
+
+    #the pairing of _buildAliasTables. With a single pdf every small column
+    #is paired, the first one with the first large column
+    alias[small[0]] = large[0]
+    for start in range(1, len(small), _BUILD_BLOCK):
+        stop = min(start + _BUILD_BLOCK, len(small))
+        k = np.searchsorted(cumSurplus, cumDeficit[start - 1:stop - 1],
+                            side='left')
+        alias[small[start:stop]] = large[k]
+    for start in range(0, len(large) - 1, _BUILD_BLOCK):
+        stop = min(start + _BUILD_BLOCK, len(large) - 1)
+        surplus = cumSurplus[start:stop]
+        l = np.searchsorted(cumDeficit, surplus, side='right')
+        covered = cumDeficit[l] - surplus
+        prob[large[start:stop]] = (height - covered) / float(height)
+        alias[large[start:stop]] = large[start + 1:stop + 1]
+    return prob, alias
+
+
+def _segmentCount(mask, starts, segment):
+    '''Return the number of True values of `mask` up to every position,
+    counted within the segment of the position'''
+    count = np.cumsum(mask)
+    return count - (count[starts] - mask[starts])[segment]
+
+
+def _integerWeights(p, totals, starts, segment):
+    '''Return int64 weights proportional to the pdfs in `p`, which sum to
+    exactly totals[s] in every segment s
+
+    Rounding down leaves less than one unit per value, which goes to the
+    positive values of the pdf (zero values stay zero), first to those that
+    rounded down to zero. The rounding errors of the scaled floats may make
+    a sum exceed its total; the excess, a few ulps of the total, is taken
+    from the largest value.
+    '''
+    #scaled by the maximum first, so that tiny or huge sums do not overflow
+    x = p / np.maximum.reduceat(p, starts)[segment]
+    x *= (totals / np.add.reduceat(x, starts))[segment]
+    w = np.floor(x).astype(np.int64)
+    del x
+    residual = totals - np.add.reduceat(w, starts)
+    over = np.flatnonzero(residual < 0)
+    if len(over):
+        largest = np.flatnonzero(w == np.maximum.reduceat(w, starts)[segment])
+        largest = largest[np.searchsorted(segment[largest], over)]
+        w[largest] += residual[over]
+        residual[over] = 0
+    positive = p > 0
+    tiny = positive & (w == 0)
+    rest = positive & (w > 0)
+    nTiny = np.add.reduceat(tiny.astype(np.int64), starts)
+    nPositive = np.add.reduceat(positive.astype(np.int64), starts)
+    rank = np.where(tiny, _segmentCount(tiny, starts, segment) - 1,
+                    nTiny[segment] + _segmentCount(rest, starts, segment) - 1)
+    r = residual[segment]
+    n = nPositive[segment]
+    w += np.where(positive, r // n + (rank < r % n), 0)
+    return w
+
+
+def _buildAliasTables(p, lengths):
+    '''Build Vose's alias tables of several pdfs stored back to back in `p`
+
+    Vose's small/large worklist pairs every small column with the current
+    large one, and a large column becomes small once it has given away
+    more than its surplus. Going through the small and the large columns
+    in order, the pairing is fully determined by the cumulative deficits of
+    the small columns and the cumulative surpluses of the large ones, so it
+    can be resolved with `np.searchsorted` instead of a Python loop.
+
+    The pairing depends on exact ties between the cumulative sums, so the
+    columns are measured in integer units (see _integerWeights): all the
+    columns are `height` units high, the deficits and the surpluses of every
+    pdf balance exactly, and the cumulative sums over all the pdfs meet at
+    the start of every pdf. The quantization changes the probabilities by
+    about 2**-62 * len(p) / lengths[s], far below the float64 rounding
+    errors of the pdf values.
+
+    @param p: flat array of non-negative pdf values
+    @param lengths: number of values of every pdf (at least 1). Every pdf
+        must have a positive sum
+    @return: (prob, alias) numpy arrays of length len(p). Aliases are
+        indices into the flat array
+    '''
+    p = np.asarray(p, dtype=float)
+    lengths = np.asarray(lengths, dtype=np.int64)
+    starts = np.concatenate(([0], lengths.cumsum()[:-1]))
+    segment = np.repeat(np.arange(len(lengths)), lengths)
+    height = 2 ** 62 // len(p) #the sum of all the columns fits in int64
+    w = _integerWeights(p, lengths * height, starts, segment)
+    prob = np.ones(len(p))
+    alias = np.arange(len(p), dtype=np.intp)
+    large = np.flatnonzero(w > height)
+    small = np.flatnonzero(w <= height)
+    prob[small] = w[small] / float(height)
+    if len(large) == 0:
+        return prob, alias
+
+    deficit = height - w[small]
+    cumDeficit = deficit.cumsum()
+    cumSurplus = (w[large] - height).cumsum()
+    del w, deficit
+    largeSegment = segment[large]
+    segments = np.arange(len(lengths))
+    largeStart = np.searchsorted(largeSegment, segments, side='left')
+    largeStop = np.searchsorted(largeSegment, segments, side='right')
+
+    #a small column is paired with the first large one that has not been
+    #exhausted by the deficits of the preceding small columns. A tie with
+    #the end of the previous pdf is resolved by the first large column of
+    #the own pdf. Pdfs without large columns have only full columns
+    smallSegment = segment[small]
+    before = np.concatenate(([0], cumDeficit[:-1]))
+    k = np.searchsorted(cumSurplus, before, side='left')
+    np.maximum(k, largeStart[smallSegment], out=k)
+    paired = k < largeStop[smallSegment]
+    alias[small[paired]] = large[k[paired]]
+
+    #a large column becomes small while serving the first small column that
+    #exhausts its surplus. Its own deficit is covered by the next large one.
+    #The last large column of every pdf is never exhausted
+    l = np.searchsorted(cumDeficit, cumSurplus, side='right')
+    k = np.flatnonzero(np.arange(1, len(large) + 1) < largeStop[largeSegment])
+    covered = cumDeficit[l[k]] - cumSurplus[k]
+    prob[large[k]] = (height - covered) / float(height)
+    alias[large[k]] = large[k + 1]
+    return prob, alias
 
 
 class RandomArbitraryInteger():
@@ -14,110 +250,423 @@ class RandomArbitraryInteger():
     IEEE TRANSACTIONS ON SOFTWARE ENGINEERING, VOL. 17, NO. 9, SEPTEMBER 1991
     http://web.eecs.utk.edu/~vose/Publications/random.pdf
     '''
-    def __init__(self, x, p=None):
+    _SAVED_SCALARS = ('sparse', '_xmin', '_n', 'tableDtype')
+    _SAVED_ARRAYS = ('_prob', '_alias', '_values')
+    tableDtype = 'float64' #default of tables saved without it
+    _instrumentation = None #see enable_instrumentation
+
+    def __init__(self, x, p=None, sparse=False, seed=None, uniforms='pseudo',
+                 tableDtype='float64'):
         '''Initialize the object
 
         @param x: integer that will be used by the generator
         @param p: probability density proile for the distribution.
             If None (default) every value in `x` will have the same probability
+        @param sparse: if False (default), the table covers every integer
+            between x[0] and x[-1]. If True, the table covers only the
+            values in `x`, which saves memory when the values are far apart
+        @param seed: None, an int, a numpy.random.SeedSequence, BitGenerator or
+            Generator. Anything numpy.random.default_rng accepts
+        @param uniforms: 'pseudo' (default) for i.i.d. uniform variates, or
+            'stratified', 'sobol' or 'halton' for variance reduction (see
+            uniforms.QuasiUniforms)
+        @param tableDtype: storage of the alias probabilities:
+            'float64' (default, 8 bytes per value), 'float32' (4 bytes) or
+            'fixed' (uint32 fixed point, 4 bytes). Rounding moves up to
+            2**-25 ('float32') or 2**-33 ('fixed') of the 1 / len(table)
+            share of every column between its value and its alias, so a
+            value that is the alias of k columns is off by up to k + 1
+            times that: at most about 3e-8 or 1.2e-10 in absolute
+            probability. The alias indices always use the
+            smallest integer dtype that fits the table (uint16 up to 65536
+            values, then int32)
         '''
 
         if p is None:
             p = [1.0, ] * len(x)
         assert len(x) == len(p)
+        self._rng = np.random.default_rng(seed)
+        self.uniforms = uniforms
+        self._quasi = makeUniforms(uniforms, self._rng)
+        self._scratchBuffers = threading.local()
+        self._frozen = False
+        self.sparse = sparse
+        self.tableDtype = tableDtype
         self.set_pdf(x, p)
 
-    def set_pdf(self, x, p):
+    def set_pdf(self, x, p, sparse=None, tableDtype=None):
         '''Set the internal probability distribution function
+
+        @param sparse, tableDtype: see __init__. If None, the current value
+            is kept
         '''
 
+        if self._frozen:
+            raise ValueError('The pdf of a frozen sampler cannot be changed')
         assert len(x) == len(p)
-        x = map(int, x)
+        x = np.asarray(x).astype(np.int64)
         assert issortedAndUnique(x)
-
-        xMin = x[0]
-        xMax = x[-1]
-        xActual = range(xMin, xMax + 1, 1)
-        pActual = [0.0,] * len(xActual)
-        ix = 0
-        for i, xValue in enumerate(xActual):
-            if xValue in x[ix:]:
-                pActual[i] = p[ix]
-                ix += 1
-        xActual = [xVal - xMin for xVal in xActual]
-        self._xmin = xMin
-        p = pActual
-        for v in p:
-            assert v >= 0
-        p = map(float, p)
-        for v in p:
-            if v < 0:
-                raise ValueError('Negative PDF values are not allowed')
-        sump = sum(p)
-        if sump == 0:
+        p = np.asarray(p, dtype=float)
+        if np.any(p < 0):
+            raise ValueError('Negative PDF values are not allowed')
+        if p.sum() == 0:
             raise ValueError('At least one non-zero PDF value is required')
-        p = [v/sump for v in p]
-        n = len(p)
-        self._n = n
-
-        #first stage -- divide indices to small and large
-        large = []
-        small = []
-        n_1 = 1.0 / n
-        for j, pValue in enumerate(p):
-            if pValue > n_1:
-                large.append(j)
-            else:
-                small.append(j)
-
-        #second stage
-        prob = [None,] * n
-        alias = [None,] * n
-        while bool(small) and bool(large):
-            j = small.pop()
-            k = large.pop()
-            prob[j] = n * p[j]
-            alias[j] = k
-            p[k] = p[k] + p[j] - n_1
-            if p[k] > n_1:
-                large.append(k)
-            else:
-                small.append(k)
-        for s in small:
-            prob[s] = 1.0
-        for l in large:
-            prob[l] = 1.0
 
-        self._prob = prob
-        self._alias = alias
+        if sparse is None:
+            sparse = self.sparse
+        self.sparse = sparse
+        if tableDtype is None:
+            tableDtype = self.tableDtype
+        if tableDtype not in TABLE_DTYPES:
+            raise ValueError('Unknown table dtype %r' % (tableDtype, ))
+        self.tableDtype = tableDtype
+        self._scratchBuffers = threading.local()
 
+        xMin = int(x[0])
+        xMax = int(x[-1])
+        if sparse:
+            pActual = p
+            self._values = x
+        else:
+            pActual = np.zeros(xMax - xMin + 1)
+            pActual[x - xMin] = p
+            self._values = None
+        self._xmin = xMin
+        self._n = len(pActual)
+        prob, alias = _buildAliasTable(pActual)
+        self._prob, self._alias = _compactTable(prob, alias, tableDtype)
+        self._cdf = None
 
-    def random(self, n=None):
+    def random(self, n=None, asList=False, lo=None, hi=None):
         '''Return random number or numbers
 
         @param n: amount of random values to return or None
-        @return: if n is None: return a scalar, if n>=1 return a list with n
-            elements, else raise an exception
+        @param asList: if True, return a list instead of a numpy array
+        @param lo, hi: if any of them is given, sample from the distribution
+            truncated to [lo, hi] (see _randTruncated)
+        @return: if n is None: return a scalar, if n>=1 return a numpy array
+            (or a list if `asList` is True) with n elements, else raise an
+            exception
         '''
 
         if n is None:
+            if lo is not None or hi is not None:
+                return self._randTruncated(None, lo, hi)[0]
             return self._randOne()
         else:
             assert n > 0
-            return [self._randOne() for i in range(n)] #@UnusedVariable
+            if lo is not None or hi is not None:
+                ret = self._randTruncated(n, lo, hi)
+            else:
+                ret = self._randN(n)
+            if asList:
+                ret = ret.tolist()
+            return ret
+
+    def sample_without_replacement(self, k):
+        '''Return k distinct random values
+
+        The values are drawn one after the other, each with a probability
+        proportional to its pdf value among the values not drawn yet. This
+        is done at once with the keys of Efraimidis and Spirakis: the k
+        values with the smallest Exp(1) / p keys, in the order of their keys.
+        Values with zero probability are never drawn.
+
+        @param k: number of values, at most the number of values with a
+            positive probability
+        @return: numpy array of k values, in the order they are drawn
+        '''
+        p = self._probabilities()
+        support = np.flatnonzero(p > 0)
+        if not 0 <= k <= len(support):
+            raise ValueError('Cannot draw %r distinct values out of %d with '
+                             'a positive probability' % (k, len(support)))
+        keys = self._rng.standard_exponential(len(support))
+        keys /= p[support]
+        if k < len(support):
+            chosen = np.argpartition(keys, k)[:k]
+        else:
+            chosen = np.arange(len(support))
+        chosen = chosen[np.argsort(keys[chosen])]
+        return self._toValues(support[chosen])
+
+    def random_into(self, out):
+        '''Fill `out` with random numbers
+
+        Internal scratch buffers are kept between the calls, so repeated calls
+        with the same size do not allocate memory (in the sparse mode, unless
+        `out` has the dtype of the values, the result is cast via a temporary
+        array).
+
+        @param out: writable numpy array of any shape (including views), or an
+            object that exposes a writable buffer, e.g. a memoryview
+        @return: out
+        '''
+        target = np.asarray(out)
+        idx = self._fillIndices(self._scratch(target.size, cached=True))
+        idx = idx.reshape(target.shape)
+        if self._values is None:
+            np.add(idx, self._xmin, out=target, casting='unsafe')
+        elif target.dtype == self._values.dtype:
+            np.take(self._values, idx, out=target, mode='clip')
+        else:
+            np.copyto(target, self._values[idx], casting='unsafe')
+        return out
+
+    def random_parallel(self, n, workers=None):
+        '''Return a numpy array of n random numbers drawn by several threads
+
+        @param n: amount of random values to return
+        @param workers: number of threads. None (default) means one per CPU
+        '''
+        return randomParallel(self, n, np.int64, workers)
+
+    def iter_chunks(self, chunkSize=CHUNK_SIZE, prefetch=False):
+        '''Yield numpy arrays of `chunkSize` random numbers, endlessly
+
+        @param prefetch: if True, a background thread generates the next chunk
+            while the current one is processed
+        '''
+        return iterChunks(self, chunkSize, prefetch)
+
+    def aiter_chunks(self, chunkSize=CHUNK_SIZE, executor=None):
+        '''Asynchronous version of iter_chunks for asyncio event loops
+
+        @param executor: concurrent.futures executor that generates the chunks.
+            If None, the default executor of the event loop is used
+        '''
+        return aiterChunks(self, chunkSize, executor)
+
+    def __iter__(self):
+        return self.iter_chunks()
+
+    def __aiter__(self):
+        return self.aiter_chunks()
+
+    def __getstate__(self):
+        '''Pickle (and deep-copy) without the thread-local scratch buffers'''
+        state = self.__dict__.copy()
+        state.pop('_scratchBuffers', None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._scratchBuffers = threading.local()
+
+    def spawn(self, k):
+        '''Return k samplers with statistically independent random streams
+
+        The children share the alias tables of this object.
+        '''
+        ret = []
+        for generator in spawnGenerators(self._rng, k):
+            child = copy.copy(self)
+            child._rng = generator
+            child._quasi = makeUniforms(self.uniforms, generator)
+            child._scratchBuffers = threading.local()
+            instrument(child, self._instrumentation)
+            ret.append(child)
+        return ret
+
+    def save(self, path):
+        '''Save the tables to the directory `path` (see persistence.saveTables)
+        '''
+        saveTables(path, self, self._SAVED_SCALARS, self._SAVED_ARRAYS)
+
+    @classmethod
+    def load(cls, path, mmap=True, seed=None):
+        '''Return a sampler with the tables saved in the directory `path`
+
+        @param mmap: if True (default) the tables are memory-mapped read-only
+            and shared between the processes that load them
+        @param seed: see __init__
+        '''
+        obj = cls.__new__(cls)
+        loadTables(path, obj, mmap)
+        obj._rng = np.random.default_rng(seed)
+        obj.uniforms = 'pseudo'
+        obj._quasi = None
+        obj._scratchBuffers = threading.local()
+        obj._frozen = False
+        obj._cdf = None
+        return obj
+
+    def freeze(self):
+        '''Make the tables read-only. set_pdf raises ValueError afterwards'''
+        for name in self._SAVED_ARRAYS:
+            value = getattr(self, name)
+            if value is not None:
+                value.flags.writeable = False
+        self._frozen = True
+
+    def enable_instrumentation(self, callback=None):
+        '''Start recording the builds and the samples of this sampler
+
+        set_pdf, random and random_into calls are timed and counted (see
+        instrumentation.Instrumentation). Children spawned afterwards share
+        the counters.
+
+        @param callback: see instrumentation.Instrumentation
+        @return: the Instrumentation object
+        '''
+        instrument(self, Instrumentation(callback))
+        return self._instrumentation
+
+    def disable_instrumentation(self):
+        '''Stop recording. Disabled instrumentation has no overhead'''
+        instrument(self, None)
+
+    def stats(self):
+        '''Return the recorded counters (see Instrumentation.stats), or None
+        if the instrumentation is disabled
+        '''
+        if self._instrumentation is None:
+            return None
+        return self._instrumentation.stats()
 
     def _uniformN(self):
-        return random.random() * self._n
+        if self._quasi is None:
+            return self._rng.random() * self._n
+        return self._quasi.fill(np.empty(1))[0] * self._n
 
     def _randOne(self):
         '''Return a single random number'''
         u = self._uniformN()
         j = int(math.floor(u))
-        if (u - j) < self._prob[j]:
+        if (u - j) * self._probScale() < self._prob[j]:
             ret = j
         else:
-            ret = self._alias[j]
-        return ret + self._xmin
+            ret = int(self._alias[j]) #a compact dtype must not reach x
+        return self._toValues(ret)
+
+    def _randN(self, n):
+        '''Return a numpy array of n random numbers'''
+        return self._toValues(self._fillIndices(self._scratch(n, cached=False)))
+
+    def _randTruncated(self, n, lo, hi):
+        '''Return a numpy array of random numbers from [lo, hi]
+
+        The uniform variates are mapped into the range of the cumulative
+        table probabilities that corresponds to [lo, hi], and then to table
+        indices by bisection. No tables are rebuilt and no samples are
+        rejected.
+
+        @param n: amount of random values to return, None for a single one
+        '''
+        if self._values is None:
+            #clamped to one past the table, infinite bounds never reach int
+            first = 0
+            if lo is not None and lo != -np.inf:
+                first = self._n if lo == np.inf else \
+                    min(max(int(math.ceil(lo)) - self._xmin, 0), self._n)
+            last = self._n - 1
+            if hi is not None and hi != np.inf:
+                last = -1 if hi == -np.inf else \
+                    max(min(int(math.floor(hi)) - self._xmin, last), -1)
+        else:
+            first = 0 if lo is None else \
+                int(np.searchsorted(self._values, lo, side='left'))
+            last = self._n - 1 if hi is None else \
+                int(np.searchsorted(self._values, hi, side='right')) - 1
+        cdf = self._cumulativeProbabilities()
+        cdfLo = cdf[first - 1] if first > 0 else 0.0
+        cdfHi = cdf[last] if last >= first else cdfLo
+        if not cdfHi > cdfLo:
+            raise ValueError('The distribution has no mass in [%r, %r]' % (
+                lo, hi))
+        u = self._uniforms(np.empty(1 if n is None else n))
+        u *= cdfHi - cdfLo
+        u += cdfLo
+        idx = np.searchsorted(cdf, u, side='right')
+        np.clip(idx, first, last, out=idx) #rounding errors
+        return self._toValues(idx)
+
+    def _probabilities(self):
+        '''Return the probabilities of the table entries
+
+        The probabilities are recovered from the alias table: entry j keeps
+        prob[j] of its own column and gets 1 - prob[i] of every column i
+        aliased to it.
+        '''
+        prob = np.asarray(self._prob, dtype=float) / self._probScale()
+        p = prob + np.bincount(self._alias, weights=1.0 - prob,
+                               minlength=self._n)
+        p /= self._n
+        return p
+
+    def _cumulativeProbabilities(self):
+        '''Return the cumulative probabilities of the table entries, cached
+        until the next set_pdf
+        '''
+        if self._cdf is None:
+            self._cdf = self._probabilities().cumsum()
+        return self._cdf
+
+    def _probScale(self):
+        '''Return the scale of the stored alias probabilities'''
+        return _FIXED_SCALE if self.tableDtype == 'fixed' else 1.0
+
+    def _uniforms(self, u):
+        '''Fill the float array `u` with uniform variates in [0, 1)'''
+        if self._quasi is None:
+            self._rng.random(out=u)
+        else:
+            self._quasi.fill(u)
+        return u
+
+    def _scratch(self, n, cached):
+        '''Return buffers for _fillIndices, reusing the previous ones if cached
+
+        The cached buffers are thread-local, so threads can share a sampler
+        (e.g. one from a SamplerCache).
+        '''
+        previous = getattr(self._scratchBuffers, 'buffers', None)
+        if cached and previous is not None and len(previous[0]) >= n:
+            return [b[:n] for b in previous]
+        floor = np.empty(n)
+        if self._prob.dtype == floor.dtype:
+            prob = floor
+        else:
+            prob = np.empty(n, dtype=self._prob.dtype)
+        buffers = (np.empty(n), floor, prob, np.empty(n, dtype=np.intp),
+                   np.empty(n, dtype=self._alias.dtype),
+                   np.empty(n, dtype=bool))
+        if cached:
+            self._scratchBuffers.buffers = buffers
+        return buffers
+
+    def _fillIndices(self, buffers):
+        '''Fill the buffers with random table indices, in place
+
+        All the uniform variates are drawn at once and the alias lookup is
+        resolved with array indexing.
+
+        @param buffers: (u, floor, prob, j, alias, useAlias) arrays of the same
+            length. prob and alias have the dtypes of the tables, and prob
+            may be the same array as floor
+        @return: j, the array of table indices
+        '''
+        u, floor, prob, j, alias, useAlias = buffers
+        self._uniforms(u)
+        u *= self._n
+        np.floor(u, out=floor)
+        u -= floor
+        np.copyto(j, floor, casting='unsafe')
+        np.minimum(j, self._n - 1, out=j) #guard against u rounding up to n
+        #mode='clip' lets np.take write into `out` without a temporary copy
+        np.take(self._prob, j, out=prob, mode='clip')
+        if self.tableDtype == 'fixed':
+            u *= _FIXED_SCALE
+        np.greater_equal(u, prob, out=useAlias)
+        np.take(self._alias, j, out=alias, mode='clip')
+        np.copyto(j, alias, where=useAlias)
+        return j
+
+    def _toValues(self, idx):
+        '''Map table indices (a scalar or an array) to values of the variate'''
+        if self._values is None:
+            return idx + self._xmin
+        return self._values[idx]
 
 
 if __name__ == '__main__':
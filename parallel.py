@@ -0,0 +1,47 @@
+import numpy as np
+
+CHUNK_SIZE = 2 ** 18
+
+
+def randomParallel(sampler, n, dtype, workers=None, chunkSize=CHUNK_SIZE):
+    '''Draw n samples from `sampler` using a pool of threads
+
+    Each worker gets a child sampler from `sampler.spawn`, i.e. its own
+    random stream and shared (not copied) tables, and fills a contiguous
+    slice of a single preallocated output array, chunk by chunk, with
+    `random_into`. NumPy releases the GIL in the bulk array operations of
+    the samplers, so the workers run concurrently.
+
+    @param sampler: RandomArbitrary or RandomArbitraryInteger object
+    @param n: number of samples
+    @param dtype: dtype of the output array
+    @param workers: number of threads. None (default) means one per CPU
+    @param chunkSize: maximal number of samples drawn by a worker at once.
+        Bounds the temporary memory used by every worker
+    @return: numpy array with n samples
+    '''
+    #imported here, they take longer to import than the samplers themselves
+    import multiprocessing
+    from concurrent.futures import ThreadPoolExecutor
+
+    assert n > 0
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    workers = max(1, min(workers, n))
+    out = np.empty(n, dtype=dtype)
+    bounds = np.linspace(0, n, workers + 1).astype(np.intp)
+    children = sampler.spawn(workers)
+
+    def fill(i):
+        child = children[i]
+        for start in range(bounds[i], bounds[i + 1], chunkSize):
+            stop = min(start + chunkSize, bounds[i + 1])
+            child.random_into(out[start:stop])
+
+    pool = ThreadPoolExecutor(max_workers=workers)
+    try:
+        for result in pool.map(fill, range(workers)):
+            pass #re-raises exceptions from the workers
+    finally:
+        pool.shutdown()
+    return out
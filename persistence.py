@@ -0,0 +1,80 @@
+import json
+import os
+
+import numpy as np
+
+FORMAT_VERSION = 1
+HEADER_FILE = 'sampler.json'
+
+
+def saveTables(path, obj, scalars, arrays):
+    '''Save the tables of a sampler to the directory `path`
+
+    The directory holds one raw .npy file per table array, named after the
+    attribute without leading underscores, and a JSON header,
+    `sampler.json`:
+
+        {"format": "randomArbitrary", "version": 1,
+         "class": <class name>,
+         "scalars": {<attribute>: <value>, ...},
+         "arrays": {<attribute>: <file name or null>, ...}}
+
+    Arrays that are None (e.g. the inverse table in the exact mode) are
+    stored as null. The header is written last, so a directory without a
+    header is incomplete.
+
+    @param path: directory name; created if it does not exist
+    @param obj: the sampler
+    @param scalars: names of the scalar attributes to save
+    @param arrays: names of the array attributes to save
+    '''
+    if not os.path.isdir(path):
+        os.makedirs(path)
+    header = {'format': 'randomArbitrary', 'version': FORMAT_VERSION,
+              'class': obj.__class__.__name__, 'scalars': {}, 'arrays': {}}
+    for name in scalars:
+        value = getattr(obj, name)
+        if isinstance(value, np.generic):
+            value = value.item()
+        header['scalars'][name] = value
+    for name in arrays:
+        value = getattr(obj, name)
+        if value is None:
+            header['arrays'][name] = None
+            continue
+        fileName = name.lstrip('_') + '.npy'
+        np.save(os.path.join(path, fileName), value)
+        header['arrays'][name] = fileName
+    with open(os.path.join(path, HEADER_FILE), 'w') as f:
+        json.dump(header, f, indent=1, sort_keys=True)
+
+
+def loadTables(path, obj, mmap=True):
+    '''Load tables saved by saveTables into the attributes of `obj`
+
+    @param path: directory name
+    @param obj: (uninitialized) sampler of the class that saved the tables
+    @param mmap: if True (default) the arrays are memory-mapped read-only, so
+        processes that load the same tables share one copy in memory
+    '''
+    with open(os.path.join(path, HEADER_FILE)) as f:
+        header = json.load(f)
+    if header.get('format') != 'randomArbitrary' or \
+            header.get('version') != FORMAT_VERSION:
+        raise ValueError('%s does not hold sampler tables of a supported '
+                         'format' % (path, ))
+    if header['class'] != obj.__class__.__name__:
+        raise ValueError('%s holds tables of %s, not of %s' % (
+            path, header['class'], obj.__class__.__name__))
+    if mmap:
+        mmapMode = 'r'
+    else:
+        mmapMode = None
+    for name, value in header['scalars'].items():
+        setattr(obj, name, value)
+    for name, fileName in header['arrays'].items():
+        if fileName is not None:
+            value = np.load(os.path.join(path, fileName), mmap_mode=mmapMode)
+        else:
+            value = None
+        setattr(obj, name, value)
@@ -0,0 +1,95 @@
+import numpy as np
+
+
+class WeightedReservoir():
+    '''Weighted random sample without replacement from a stream of items.
+
+    Every item gets the key Exp(1) / weight (Efraimidis and Spirakis) and the
+    reservoir keeps the k items with the smallest keys, so the sample is
+    distributed as k draws without replacement, each proportional to the
+    weight among the items not drawn yet. Memory does not depend on the
+    length of the stream. Reservoirs filled from parts of a stream (with
+    independent seeds, e.g. from SeedSequence.spawn) can be merged.
+    '''
+    def __init__(self, k, seed=None):
+        '''
+        @param k: size of the sample
+        @param seed: None, an int, a numpy.random.SeedSequence, BitGenerator or
+            Generator. Anything numpy.random.default_rng accepts
+        '''
+        if k < 0:
+            raise ValueError('The sample size must not be negative')
+        self.k = k
+        self._rng = np.random.default_rng(seed)
+        self._keys = np.empty(0)
+        self._items = None
+
+    def update(self, items, weights):
+        '''Add a chunk of the stream
+
+        @param items: array of items (along the first axis)
+        @param weights: non-negative weights of the items. Items with zero
+            weight are never sampled
+        '''
+        items = np.asarray(items)
+        weights = np.asarray(weights, dtype=float).reshape(-1)
+        if len(items) != len(weights):
+            raise ValueError('Need one weight per item')
+        if not np.all(weights >= 0):
+            raise ValueError('Negative weights are not allowed')
+        positive = weights > 0
+        items = items[positive]
+        keys = self._rng.standard_exponential(len(items))
+        keys /= weights[positive]
+        if self._items is not None:
+            if 0 < self.k == len(self._keys):
+                #only keys below the largest kept one can enter the sample
+                better = keys < self._keys.max()
+                items = items[better]
+                keys = keys[better]
+            items = np.concatenate((self._items, items))
+            keys = np.concatenate((self._keys, keys))
+        self._keep(items, keys)
+        return self
+
+    def merge(self, other):
+        '''Add the sample of another reservoir with the same k'''
+        if other.k != self.k:
+            raise ValueError('Only reservoirs of the same size can be merged')
+        if other._items is None:
+            return self
+        if self._items is None:
+            self._keep(other._items, other._keys)
+        else:
+            self._keep(np.concatenate((self._items, other._items)),
+                       np.concatenate((self._keys, other._keys)))
+        return self
+
+    def __iadd__(self, other):
+        return self.merge(other)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def sample(self):
+        '''Return the sampled items, in the order they are drawn
+
+        Fewer than k items are returned if fewer than k items with a positive
+        weight have been added.
+        '''
+        if self._items is None:
+            return np.empty(0)
+        return self._items[np.argsort(self._keys)]
+
+    def _keep(self, items, keys):
+        '''Keep the k items with the smallest keys'''
+        if len(keys) > self.k:
+            chosen = np.argpartition(keys, self.k)[:self.k]
+            items = items[chosen]
+            keys = keys[chosen]
+        self._items = items
+        self._keys = keys
+
+
+if __name__ == '__main__':
+    pass
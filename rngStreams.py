@@ -0,0 +1,19 @@
+import numpy as np
+
+
+def spawnGenerators(generator, k):
+    '''Return k generators with statistically independent streams
+
+    The children are derived from the SeedSequence of `generator` and use the
+    same bit generator type. Spawning again gives new, different children.
+
+    @param generator: numpy.random.Generator seeded from a SeedSequence
+    @param k: number of generators to return
+    '''
+    bitGenerator = generator.bit_generator
+    seedSeq = bitGenerator._seed_seq #public as `seed_seq` in numpy>=1.25 only
+    if seedSeq is None:
+        raise ValueError('The generator was not seeded from a SeedSequence '
+                         'and cannot be spawned')
+    return [np.random.Generator(type(bitGenerator)(s))
+            for s in seedSeq.spawn(k)]
@@ -0,0 +1,114 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+def tableBytes(sampler):
+    '''Return the number of bytes used by the tables of `sampler`'''
+    nbytes = 0
+    for name in sampler._SAVED_ARRAYS:
+        value = getattr(sampler, name)
+        if value is not None:
+            nbytes += value.nbytes
+    return nbytes
+
+
+def _inputKey(cls, x, p, kwargs):
+    '''Return a hash of the class, the input arrays and the parameters'''
+    h = hashlib.sha1()
+    h.update(('%s.%s' % (cls.__module__, cls.__name__)).encode())
+    for value in (x, p):
+        if value is None:
+            h.update(b'None')
+            continue
+        value = np.ascontiguousarray(value)
+        h.update(('%s%r' % (value.dtype.str, value.shape)).encode())
+        h.update(value.tobytes())
+    h.update(repr(sorted(kwargs.items())).encode())
+    return h.hexdigest()
+
+
+class SamplerCache():
+    '''Thread-safe cache of built samplers with LRU eviction.
+
+    Samplers are keyed by a hash of their class, input arrays and parameters,
+    so equal inputs give the same, frozen (immutable) sampler. When the total
+    size of the cached tables exceeds `maxBytes`, the least recently used
+    samplers are evicted.
+
+    A cached sampler is shared by all its users, including its random
+    stream. Users that need their own (reproducible) stream should call
+    `spawn` on it, which shares the tables.
+    '''
+    def __init__(self, maxBytes=256 * 2 ** 20):
+        '''
+        @param maxBytes: budget for the total size of the cached tables
+        '''
+        self.maxBytes = maxBytes
+        self._lock = threading.Lock()
+        self._samplers = OrderedDict() #key -> (sampler, nbytes)
+        self._nbytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, cls, x, p=None, **kwargs):
+        '''Return a frozen `cls(x, p, **kwargs)`, building it if not cached
+
+        Samplers larger than the whole budget are returned but not cached.
+        '''
+        if 'seed' in kwargs:
+            raise ValueError('Cached samplers are shared. Use spawn() on the '
+                             'returned sampler to get a seeded stream')
+        key = _inputKey(cls, x, p, kwargs)
+        with self._lock:
+            if key in self._samplers:
+                self._samplers.move_to_end(key)
+                self._hits += 1
+                return self._samplers[key][0]
+            self._misses += 1
+
+        #build outside the lock, so that other requests are not blocked
+        sampler = cls(x, p, **kwargs)
+        sampler.freeze()
+        nbytes = tableBytes(sampler)
+        with self._lock:
+            if key in self._samplers: #built concurrently by another thread
+                self._samplers.move_to_end(key)
+                return self._samplers[key][0]
+            if nbytes <= self.maxBytes:
+                self._samplers[key] = (sampler, nbytes)
+                self._nbytes += nbytes
+                while self._nbytes > self.maxBytes:
+                    evictedKey, (evicted, evictedBytes) = \
+                        self._samplers.popitem(last=False)
+                    self._nbytes -= evictedBytes
+                    self._evictions += 1
+        return sampler
+
+    def stats(self):
+        '''Return a dict with hits, misses, evictions, entries and bytes'''
+        with self._lock:
+            return {'hits': self._hits, 'misses': self._misses,
+                    'evictions': self._evictions,
+                    'entries': len(self._samplers), 'bytes': self._nbytes,
+                    'maxBytes': self.maxBytes}
+
+    def clear(self):
+        '''Remove all the samplers from the cache (statistics are kept)'''
+        with self._lock:
+            self._samplers.clear()
+            self._nbytes = 0
+
+
+defaultCache = SamplerCache()
+
+
+def cachedSampler(cls, x, p=None, **kwargs):
+    '''Return a frozen `cls(x, p, **kwargs)` from the package-wide cache
+
+    @param cls: RandomArbitrary or RandomArbitraryInteger
+    '''
+    return defaultCache.get(cls, x, p, **kwargs)
@@ -0,0 +1,77 @@
+import queue
+import threading
+
+CHUNK_SIZE = 2 ** 16
+
+
+def iterChunks(sampler, chunkSize=CHUNK_SIZE, prefetch=False):
+    '''Yield numpy arrays of `chunkSize` samples from `sampler`, endlessly
+
+    @param sampler: RandomArbitrary or RandomArbitraryInteger object
+    @param chunkSize: number of samples in every chunk
+    @param prefetch: if True, a background thread generates the next chunk
+        while the consumer processes the current one. The sampler must not
+        be used by others until the iterator is closed
+    '''
+    if prefetch:
+        return _prefetchedChunks(sampler, chunkSize)
+    return _chunks(sampler, chunkSize)
+
+
+def _chunks(sampler, chunkSize):
+    while True:
+        yield sampler.random(chunkSize)
+
+
+def _prefetchedChunks(sampler, chunkSize):
+    '''Like _chunks, but generates the next chunk in a background thread'''
+    chunks = queue.Queue(maxsize=1)
+    stop = threading.Event()
+
+    def put(item):
+        '''Queue `item`, unless the consumer stops before there is room'''
+        while not stop.is_set():
+            try:
+                chunks.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def produce():
+        try:
+            while not stop.is_set():
+                put((sampler.random(chunkSize), None))
+        except Exception as e:
+            put((None, e))
+
+    thread = threading.Thread(target=produce)
+    thread.daemon = True
+    thread.start()
+    try:
+        while True:
+            chunk, error = chunks.get()
+            if error is not None:
+                raise error
+            yield chunk
+    finally:
+        stop.set()
+        thread.join()
+
+
+async def aiterChunks(sampler, chunkSize=CHUNK_SIZE, executor=None):
+    '''Asynchronously yield numpy arrays of `chunkSize` samples, endlessly
+
+    The chunks are generated in `executor` (the default executor of the
+    running event loop if None), the next one while the consumer processes
+    the current one, so the event loop is never blocked by sampling.
+    '''
+    import asyncio #slow to import and not needed by synchronous users
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(executor, sampler.random, chunkSize)
+    try:
+        while True:
+            chunk = await future
+            future = loop.run_in_executor(executor, sampler.random, chunkSize)
+            yield chunk
+    finally:
+        future.cancel()
@@ -0,0 +1,72 @@
+import unittest
+import numpy as np
+
+import sys
+sys.path.append(r'../../')
+import randomArbitrary
+from randomArbitrary.intRandom import _buildAliasTables
+
+
+class TestRandomIntegerBatch(unittest.TestCase):
+
+    def testAliasTablesReproducePdfs(self):
+        '''Packed alias tables must encode exactly every requested pdf'''
+        TIMES = 60
+        for t in range(TIMES): #@UnusedVariable
+            lengths = np.random.randint(1, 30, np.random.randint(1, 50))
+            if t % 3:
+                #small integer weights tie often
+                p = np.random.randint(0, 5, lengths.sum()).astype(float)
+            else:
+                p = np.exp(np.random.randn(lengths.sum()) * 3)
+                p[np.random.rand(len(p)) < 0.3] = 0.0
+            starts = np.concatenate(([0], lengths.cumsum()[:-1]))
+            p[starts] += 1.0 #make sure every pdf has a positive sum
+            prob, alias = _buildAliasTables(p, lengths)
+            self.assertTrue(np.all((prob >= 0) & (prob <= 1)))
+            segment = np.repeat(np.arange(len(lengths)), lengths)
+            self.assertTrue(np.all(segment[alias] == segment))
+            pAlias = prob + np.bincount(alias, weights=1.0 - prob,
+                                        minlength=len(p))
+            for start, n in zip(starts, lengths):
+                expected = p[start:start + n] / p[start:start + n].sum()
+                self.assertTrue(np.allclose(pAlias[start:start + n] / n,
+                                            expected, atol=1e-12))
+
+    def testSampleWithTies(self):
+        '''Pdfs whose deficits and surpluses tie are sampled correctly'''
+        SAMPLES = 200000
+        rng = randomArbitrary.RandomArbitraryIntegerBatch(
+            [[0, 1], [0, 1, 2, 3]], [[2, 3], [1, 2, 0, 3]], seed=0)
+        r = rng.sample(np.full(SAMPLES, 1))
+        freq = np.bincount(r, minlength=4) / float(SAMPLES)
+        self.assertTrue(np.allclose(freq, [1 / 6., 1 / 3., 0, 0.5], atol=0.01))
+
+    def testSampleFollowsDistributions(self):
+        '''Every id is sampled from its own distribution'''
+        SAMPLES = 100000
+        xs = [[1, 2, 3], [-5], [10, 1000]]
+        ps = [[1, 0, 3], [2], [1, 1]]
+        rng = randomArbitrary.RandomArbitraryIntegerBatch(xs, ps, seed=1)
+        self.assertEqual(len(rng), 3)
+        for i in range(len(xs)):
+            r = rng.sample(np.repeat(i, SAMPLES))
+            for x, p in zip(xs[i], ps[i]):
+                freq = np.mean(r == x)
+                self.assertAlmostEqual(freq, p / float(sum(ps[i])), delta=0.01)
+        ids = np.random.randint(0, 3, (10, 20))
+        r = rng.sample(ids)
+        self.assertEqual(r.shape, ids.shape)
+        self.assertTrue(np.all(r[ids == 1] == -5))
+        self.assertTrue(np.isscalar(rng.sample(0)))
+
+    def testBadArguments(self):
+        '''Negative, all-zero or mismatched pdfs raise ValueError'''
+        cls = randomArbitrary.RandomArbitraryIntegerBatch
+        self.assertRaises(ValueError, cls, [[1, 2], [3]], [[1, 1], [0]])
+        self.assertRaises(ValueError, cls, [[1, 2], [3]], [[1, -1], [1]])
+        self.assertRaises(ValueError, cls, [[1, 2], [3]], [[1], [1]])
+
+
+if __name__ == "__main__":
+    unittest.main()
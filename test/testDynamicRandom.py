@@ -0,0 +1,52 @@
+import unittest
+import numpy as np
+
+import sys
+sys.path.append(r'../../')
+import randomArbitrary
+
+
+class TestRandomIntegerDynamic(unittest.TestCase):
+
+    def testTreeSumsAfterUpdates(self):
+        '''Inner nodes hold the sums of the current weights'''
+        TIMES = 1000
+        for n in (1, 2, 7, 64, 100):
+            x = np.arange(n) * 3 - 5
+            p = np.random.rand(n)
+            rng = randomArbitrary.RandomArbitraryIntegerDynamic(x, p)
+            for t in range(TIMES): #@UnusedVariable
+                i = np.random.randint(n)
+                p[i] = np.random.rand()
+                rng.update(x[i], p[i])
+            self.assertAlmostEqual(rng._tree[1], p.sum())
+            for i in range(n):
+                self.assertEqual(rng.weight(x[i]), p[i])
+
+    def testRandomFollowsUpdatedDistribution(self):
+        '''Samples follow the weights after updates, zero weights never appear'''
+        SAMPLES = 100000
+        x = [-3, 0, 4, 10, 11]
+        rng = randomArbitrary.RandomArbitraryIntegerDynamic(x, seed=1)
+        rng.update(0, 0.0)
+        rng.update(10, 3.0)
+        p = np.array([1, 0, 1, 3, 1], dtype=float) / 6
+        for r in (rng.random(SAMPLES),
+                  np.array([rng.random() for i in range(SAMPLES // 10)])):
+            for value, expected in zip(x, p):
+                self.assertAlmostEqual(np.mean(r == value), expected,
+                                       delta=0.02)
+        self.assertEqual(len(rng.random(5, asList=True)), 5)
+
+    def testBadUpdates(self):
+        '''Unknown values, negative and all-zero weights raise ValueError'''
+        rng = randomArbitrary.RandomArbitraryIntegerDynamic([1, 2])
+        self.assertRaises(ValueError, rng.update, 3, 1.0)
+        self.assertRaises(ValueError, rng.update, 1, -1.0)
+        rng.update(1, 0.0)
+        rng.update(2, 0.0)
+        self.assertRaises(ValueError, rng.random)
+
+
+if __name__ == "__main__":
+    unittest.main()
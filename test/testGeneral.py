@@ -132,6 +132,284 @@ class TestRNG(unittest.TestCase):
             else:
                 self.fail()
 
+    def testSeedIsReproducible(self):
+        '''Samplers with the same seed produce the same numbers'''
+        x = np.arange(10) + 1
+        for cls in self.classes:
+            for seed in (1, np.random.SeedSequence(2)):
+                a = cls(x, seed=seed)
+                b = cls(x, seed=seed)
+                self.assertTrue(np.all(a.random(100) == b.random(100)))
+            a = cls(x, seed=np.random.default_rng(3))
+            b = cls(x, seed=np.random.PCG64(3))
+            self.assertTrue(np.all(a.random(100) == b.random(100)))
+
+    def testSpawnIndependentStreams(self):
+        '''spawn(k) gives k reproducible samplers with different streams'''
+        x = np.arange(1000)
+        for cls in self.classes:
+            children = cls(x, seed=4).spawn(3)
+            again = cls(x, seed=4).spawn(3)
+            self.assertEqual(len(children), 3)
+            samples = [c.random(100) for c in children]
+            for i, child in enumerate(again):
+                self.assertTrue(np.all(child.random(100) == samples[i]))
+            self.assertFalse(np.all(samples[0] == samples[1]))
+            self.assertFalse(np.all(samples[1] == samples[2]))
+
+    def testRandomParallel(self):
+        '''random_parallel(n) fills n values reproducibly from a thread pool'''
+        from randomArbitrary.parallel import randomParallel
+        x = np.arange(10) + 1
+        for cls in self.classes:
+            a = cls(x, seed=5).random_parallel(10001, workers=3)
+            b = cls(x, seed=5).random_parallel(10001, workers=3)
+            self.assertEqual(len(a), 10001)
+            self.assertTrue(np.all(a == b))
+            self.assertTrue(np.all((a >= 1) & (a <= 10)))
+            self.assertEqual(len(cls(x).random_parallel(2, workers=8)), 2)
+            c = randomParallel(cls(x, seed=5), 10001, float, workers=3,
+                               chunkSize=100)
+            self.assertTrue(np.all(a == c))
+
+    def testRandomInto(self):
+        '''random_into(out) writes the same numbers as random(n) into out'''
+        import array
+        x = np.arange(10) + 1
+        for cls in self.classes:
+            expected = cls(x, seed=6).random(100)
+            dtype = expected.dtype
+            obj = cls(x, seed=6)
+            out = np.zeros(100, dtype=dtype)
+            self.assertTrue(obj.random_into(out) is out)
+            self.assertTrue(np.all(out == expected))
+
+            expected = cls(x, seed=7).random(300)
+            obj = cls(x, seed=7)
+            out = np.zeros((2, 100), dtype=dtype)
+            obj.random_into(out[:, ::2]) #non-contiguous view
+            obj.random_into(out[:, 1::2])
+            self.assertTrue(np.all(out[:, ::2].ravel() == expected[:100]))
+            self.assertTrue(np.all(out[:, 1::2].ravel() == expected[100:200]))
+            buf = array.array(dtype.char, [0] * 100)
+            obj.random_into(memoryview(buf))
+            self.assertTrue(np.all(np.array(buf) == expected[200:]))
+
+    def testSaveLoad(self):
+        '''Loaded samplers have the saved tables and sample identically'''
+        import os
+        import shutil
+        import tempfile
+        x = np.array([-7, -3, 0, 2, 9])
+        p = np.random.rand(len(x))
+        tmpDir = tempfile.mkdtemp()
+        try:
+            objects = [randomArbitrary.RandomArbitrary(x, p, Nrl=50),
+                       randomArbitrary.RandomArbitrary(x, p, mode='exact'),
+                       randomArbitrary.RandomArbitraryInteger(x, p),
+                       randomArbitrary.RandomArbitraryInteger(x, p, sparse=True),
+                       randomArbitrary.RandomArbitrary(x, p, tableDtype='float32'),
+                       randomArbitrary.RandomArbitrary(x, p, Nrl=20,
+                                                       tableDtype='float32'),
+                       randomArbitrary.RandomArbitraryInteger(
+                           x, p, tableDtype='fixed'),
+                       randomArbitrary.RandomArbitraryInteger(
+                           x, p, sparse=True, tableDtype='float32')]
+            for i, obj in enumerate(objects):
+                path = os.path.join(tmpDir, str(i))
+                obj.save(path)
+                cls = obj.__class__
+                for mmap in (True, False):
+                    loaded = cls.load(path, mmap=mmap, seed=8)
+                    for name in cls._SAVED_SCALARS:
+                        self.assertEqual(getattr(loaded, name),
+                                         getattr(obj, name))
+                    for name in cls._SAVED_ARRAYS:
+                        a = getattr(obj, name)
+                        b = getattr(loaded, name)
+                        if a is None:
+                            self.assertTrue(b is None)
+                        else:
+                            self.assertTrue(np.all(a == b))
+                            self.assertEqual(a.dtype, b.dtype)
+                            self.assertEqual(isinstance(b, np.memmap), mmap)
+                    expected = cls.load(path, seed=8).random(100)
+                    self.assertTrue(np.all(loaded.random(100) == expected))
+                other = objects[(i + 2) % len(objects)].__class__
+                self.assertRaises(ValueError, other.load, path)
+        finally:
+            shutil.rmtree(tmpDir)
+
+    def testPickle(self):
+        '''Pickled and deep-copied samplers continue the same stream'''
+        import copy
+        import pickle
+        x = np.arange(10) + 1
+        for cls in self.classes:
+            obj = cls(x, seed=9)
+            obj.random_into(np.zeros(100, dtype=obj.random(1).dtype))
+            for clone in (lambda o: pickle.loads(pickle.dumps(o)),
+                          copy.deepcopy):
+                other = clone(obj)
+                self.assertTrue(np.all(other.random(100) == obj.random(100)))
+                obj = other
+
+    def testIterChunks(self):
+        '''Chunk iterators yield the same stream as repeated random(n)'''
+        import asyncio
+        import threading
+        x = np.arange(10) + 1
+        for cls in self.classes:
+            expected = cls(x, seed=9).random(300)
+            for prefetch in (False, True):
+                nThreads = threading.active_count()
+                chunks = cls(x, seed=9).iter_chunks(100, prefetch=prefetch)
+                for i in range(3):
+                    self.assertTrue(np.all(next(chunks) ==
+                                           expected[i * 100:(i + 1) * 100]))
+                chunks.close()
+                self.assertEqual(threading.active_count(), nThreads)
+            chunk = next(iter(cls(x)))
+            self.assertTrue(len(chunk) > 1)
+
+            async def consume(obj):
+                ret = []
+                async for chunk in obj.aiter_chunks(100):
+                    ret.append(chunk)
+                    if len(ret) == 3:
+                        break
+                return np.concatenate(ret)
+            r = asyncio.run(consume(cls(x, seed=9)))
+            self.assertTrue(np.all(r == expected))
+
+    def testPrefetchErrors(self):
+        '''Sampling errors reach the consumer and do not block close()'''
+        import threading
+        import time
+        from randomArbitrary.streaming import iterChunks
+
+        class Failing():
+            '''Sampler that fails on its third call'''
+            calls = 0
+
+            def random(self, n):
+                self.calls += 1
+                if self.calls == 3:
+                    raise RuntimeError('sampling failed')
+                return np.zeros(n)
+        chunks = iterChunks(Failing(), 10, prefetch=True)
+        next(chunks)
+        next(chunks)
+        self.assertRaises(RuntimeError, next, chunks)
+        chunks = iterChunks(Failing(), 10, prefetch=True)
+        next(chunks)
+        time.sleep(0.3) #the second chunk is queued, the error is waiting
+        closer = threading.Thread(target=chunks.close)
+        closer.daemon = True
+        closer.start()
+        closer.join(5)
+        self.assertFalse(closer.is_alive())
+
+    def testTruncatedSampling(self):
+        '''random(n, lo, hi) samples the distribution restricted to [lo, hi]'''
+        SAMPLES = 20000
+        x = np.arange(10) + 1
+        p = np.random.rand(10) + 0.1
+        p[5] = 0.0
+        for obj in (randomArbitrary.RandomArbitraryInteger(x, p),
+                    randomArbitrary.RandomArbitraryInteger(x, p, sparse=True)):
+            r = obj.random(SAMPLES, lo=2.5, hi=7)
+            for v in range(3, 8):
+                self.assertAlmostEqual(np.mean(r == v),
+                                       p[v - 1] / p[2:7].sum(), delta=0.02)
+            self.assertTrue(np.all(obj.random(100, hi=1) == 1))
+            self.assertTrue(obj.random(lo=10) == 10)
+            self.assertRaises(ValueError, obj.random, 10, lo=6, hi=6)
+            self.assertRaises(ValueError, obj.random, 10, lo=11)
+            #bounds beyond the support
+            for lo, hi in ((20, None), (None, -5), (np.inf, None),
+                           (None, -np.inf), (20, 30)):
+                self.assertRaises(ValueError, obj.random, 10, lo=lo, hi=hi)
+            r = obj.random(100, lo=-np.inf, hi=np.inf)
+            self.assertTrue(np.all(p[r - 1] > 0))
+            self.assertTrue(np.all(obj.random(100, lo=-5, hi=1.5) == 1))
+
+        for mode in ('table', 'exact'):
+            obj = randomArbitrary.RandomArbitrary(x, p, mode=mode)
+            r = np.sort(obj.random(SAMPLES, lo=2.5, hi=7))
+            self.assertTrue(r[0] >= 2.5 and r[-1] <= 7)
+            cdf = np.interp(r, x, obj.cdf)
+            cdfLo, cdfHi = np.interp([2.5, 7], x, obj.cdf)
+            expected = (cdf - cdfLo) / (cdfHi - cdfLo)
+            ecdf = np.arange(1, SAMPLES + 1) / float(SAMPLES)
+            self.assertTrue(np.max(np.abs(expected - ecdf)) < 0.02)
+            self.assertTrue(np.isscalar(obj.random(lo=3)))
+            self.assertTrue(np.all(obj.random(100, hi=1) == 1)) #point mass
+            self.assertRaises(ValueError, obj.random, 10, lo=5.2, hi=5.8)
+            self.assertRaises(ValueError, obj.random, 10, lo=10.5)
+
+    def testQuasiUniforms(self):
+        '''Stratified and low-discrepancy uniforms reduce the variance of means
+        '''
+        import warnings
+        REPEATS = 30
+        SAMPLES = 256
+        x = np.arange(100)
+        p = np.random.rand(100)
+        mean = np.sum(x * p) / np.sum(p)
+        for cls in self.classes:
+            a = cls(x, p, seed=10, uniforms='stratified').random(SAMPLES)
+            b = cls(x, p, seed=10, uniforms='stratified').random(SAMPLES)
+            self.assertTrue(np.all(a == b))
+            self.assertTrue(np.isscalar(cls(x, p, uniforms='sobol').random()))
+            spread = {}
+            for uniforms in ('pseudo', 'stratified', 'sobol', 'halton'):
+                obj = cls(x, p, uniforms=uniforms)
+                with warnings.catch_warnings():
+                    warnings.simplefilter('ignore')
+                    means = [np.mean(obj.random(SAMPLES))
+                             for i in range(REPEATS)]
+                    child = obj.spawn(1)[0]
+                    self.assertEqual(len(child.random(SAMPLES)), SAMPLES)
+                self.assertAlmostEqual(np.mean(means), mean, delta=3)
+                spread[uniforms] = np.std(means)
+            for uniforms in ('stratified', 'sobol', 'halton'):
+                self.assertTrue(spread[uniforms] < spread['pseudo'] / 3)
+            self.assertRaises(ValueError, cls, x, p, uniforms='bogus')
+
+    def testInstrumentation(self):
+        '''Enabled instrumentation counts the builds and the samples'''
+        x = np.arange(10)
+        p = np.random.rand(10)
+        for cls in self.classes:
+            obj = cls(x, p)
+            self.assertTrue(obj.stats() is None)
+            events = []
+            obj.enable_instrumentation(
+                lambda event, n, seconds: events.append((event, n)))
+            obj.set_pdf(x, p)
+            obj.random()
+            obj.random(100)
+            obj.random(10, lo=3)
+            obj.random_into(np.zeros((2, 3)))
+            child = obj.spawn(1)[0]
+            child.random(1000)
+            obj.random_parallel(5000, workers=2)
+            stats = obj.stats()
+            self.assertEqual(stats['builds'], 1)
+            self.assertTrue(stats['lastBuildSeconds'] > 0)
+            self.assertEqual(stats['samples'], 1 + 100 + 10 + 6 + 1000 + 5000)
+            self.assertEqual(stats['sampleCalls'], 7)
+            self.assertEqual(stats['batchSizes'],
+                             {1: 1, 64: 1, 8: 1, 4: 1, 512: 1, 2048: 2})
+            self.assertEqual(events[:3], [('build', None), ('sample', 1),
+                                          ('sample', 100)])
+            self.assertTrue(child.stats() == obj.stats())
+            obj.disable_instrumentation()
+            obj.random(10)
+            self.assertTrue(obj.stats() is None)
+            self.assertEqual(child.stats()['samples'], stats['samples'])
+
     @staticmethod
     def _cdfFromSample(xValues, theSample):
         theSample = np.array(theSample)
@@ -0,0 +1,50 @@
+import unittest
+import numpy as np
+
+import sys
+sys.path.append(r'../../')
+import randomArbitrary
+
+
+class TestRandomGrid(unittest.TestCase):
+
+    def testPointsFollowGrid(self):
+        '''Points fall in cells with the cell probabilities'''
+        SAMPLES = 100000
+        edges = [[0.0, 1.0, 3.0], [-1.0, 0.0, 0.5, 2.0]]
+        p = np.array([[1.0, 0.0, 2.0],
+                      [3.0, 4.0, 0.0]])
+        rng = randomArbitrary.RandomArbitraryGrid(edges, p, seed=1)
+        points = rng.random(SAMPLES)
+        self.assertEqual(points.shape, (SAMPLES, 2))
+        self.assertEqual(rng.random().shape, (2, ))
+        counts = np.histogramdd(points, bins=edges)[0]
+        self.assertEqual(counts.sum(), SAMPLES)
+        self.assertTrue(np.allclose(counts / SAMPLES, p / p.sum(), atol=0.01))
+        #uniform within a cell
+        inCell = points[(points[:, 0] > 1) & (points[:, 1] < 0)]
+        self.assertAlmostEqual(np.mean(inCell[:, 0]), 2.0, delta=0.02)
+        self.assertAlmostEqual(np.mean(inCell[:, 1]), -0.5, delta=0.02)
+
+    def testCompactTablesAnd3D(self):
+        '''3-D grids work and the tables use compact dtypes'''
+        p = np.random.rand(4, 5, 6).astype(np.float32)
+        edges = [np.arange(s + 1) for s in p.shape]
+        rng = randomArbitrary.RandomArbitraryGrid(edges, p)
+        self.assertEqual(rng._prob.dtype, np.float32)
+        self.assertEqual(rng._alias.dtype, np.uint16)
+        points = rng.random(1000)
+        self.assertTrue(np.all(points >= 0))
+        self.assertTrue(np.all(points <= np.array(p.shape)))
+
+    def testBadArguments(self):
+        '''Mismatching edges and negative probabilities raise ValueError'''
+        cls = randomArbitrary.RandomArbitraryGrid
+        self.assertRaises(ValueError, cls, [[0, 1, 2]], np.ones((2, 2)))
+        self.assertRaises(ValueError, cls, [[0, 1], [0, 1]], np.ones((2, 1)))
+        self.assertRaises(ValueError, cls, [[0, 2, 1]], np.ones(2))
+        self.assertRaises(ValueError, cls, [[0, 1, 2]], [1, -1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+
+import sys
+sys.path.append(r'../../')
+import randomArbitrary
+from randomArbitrary.histogram import histogramFromSamples
+
+
+class TestStreamingHistogram(unittest.TestCase):
+
+    def testUpdateMatchesNumpyHistogram(self):
+        '''Streaming counts equal np.histogram, outliers are counted apart'''
+        data = np.random.randn(10000)
+        data[:10] = np.nan
+        hist = randomArbitrary.StreamingHistogram(-2.0, 2.0, 40)
+        for chunk in np.array_split(data, 7):
+            hist.update(chunk)
+        hist.update([2.0]) #the upper edge belongs to the last bin
+        expected = np.histogram(np.append(data, 2.0), bins=40,
+                                range=(-2.0, 2.0))[0]
+        self.assertTrue(np.all(hist.counts == expected))
+        self.assertEqual(hist.underflow, np.sum(data < -2.0))
+        self.assertEqual(hist.overflow, np.sum(data > 2.0))
+
+    def testMerge(self):
+        '''Merged partial histograms equal the histogram of all the data'''
+        data = np.random.rand(1000)
+        parts = [randomArbitrary.StreamingHistogram(0, 1, 10).update(chunk)
+                 for chunk in np.array_split(data, 3)]
+        merged = parts[0]
+        merged += parts[1]
+        merged.merge(parts[2])
+        whole = randomArbitrary.StreamingHistogram(0, 1, 10).update(data)
+        self.assertTrue(np.all(merged.counts == whole.counts))
+        self.assertRaises(ValueError, merged.merge,
+                          randomArbitrary.StreamingHistogram(0, 2, 10))
+
+    def testFromSamples(self):
+        '''Samplers built from raw data follow the data histogram'''
+        data = np.random.exponential(size=100000)
+        tmpDir = tempfile.mkdtemp()
+        try:
+            fileName = os.path.join(tmpDir, 'data.npy')
+            np.save(fileName, data)
+            mapped = np.load(fileName, mmap_mode='r')
+            hist = histogramFromSamples(mapped, bins=50, chunkSize=1000)
+            self.assertEqual(hist.counts.sum(), len(data))
+            self.assertEqual(hist.edges[0], data.min())
+            self.assertEqual(hist.edges[-1], data.max())
+            del mapped
+        finally:
+            shutil.rmtree(tmpDir)
+
+        chunks = np.array_split(data, 10)
+        obj = randomArbitrary.RandomArbitrary.from_samples(
+            iter(chunks), bins=100, valueRange=(0, 5), mode='exact')
+        theSample = np.sort(obj.random(100000))
+        self.assertTrue(theSample[0] >= 0 and theSample[-1] <= 5)
+        expected = np.searchsorted(np.sort(data[data <= 5]), theSample) / \
+            float(np.sum(data <= 5))
+        ecdf = np.arange(1, len(theSample) + 1) / float(len(theSample))
+        self.assertTrue(np.max(np.abs(expected - ecdf)) < 0.02)
+        self.assertRaises(ValueError,
+                          randomArbitrary.RandomArbitrary.from_samples,
+                          iter(chunks))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -16,7 +16,7 @@ class TestGeneralRandomInteger(testGeneral.TestRNG):
         nPoints = 10        
         SAMPLES = 100 * nPoints
         TIMES = 10
-        for t in xrange(TIMES): #@UnusedVariable
+        for t in range(TIMES): #@UnusedVariable
             xValues = []
             while len(xValues) < 2:
                 xValues = np.random.randint(-100, 100, nPoints).tolist()
@@ -43,9 +43,159 @@ class TestGeneralRandomInteger(testGeneral.TestRNG):
             rng = randomArbitrary.RandomArbitraryInteger(x=xValues,
                                                        p=pValues)
             r = rng.random(TIMES)
-            f = filter(lambda v: v==i, r)
+            f = list(filter(lambda v: v==i, r))
             self.assertTrue(len(f)==0)
                 
+    def testRandNReturnTypes(self):
+        '''random(N) returns a numpy array, or a list if asked to'''
+        rng = randomArbitrary.RandomArbitraryInteger(x=[-2, 0, 3], p=[1, 2, 3])
+        r = rng.random(100)
+        self.assertTrue(isinstance(r, np.ndarray))
+        self.assertEqual(r.shape, (100, ))
+        self.assertTrue(set(r.tolist()) <= set([-2, 0, 3]))
+        r = rng.random(100, asList=True)
+        self.assertTrue(isinstance(r, list))
+        self.assertEqual(len(r), 100)
+
+    def testAliasTableReproducesPdf(self):
+        '''The alias table must encode exactly the requested pdf'''
+        from randomArbitrary.intRandom import _buildAliasTable, \
+            _buildAliasTables
+        TIMES = 400
+        #weights whose cumulative deficits and surpluses tie
+        tieWeights = (lambda n: np.random.choice([0.1, 0.2, 0.3, 0.7], n),
+                      lambda n: np.round(np.random.rand(n), 1),
+                      lambda n: np.random.randint(0, 5, n).astype(float),
+                      lambda n: np.repeat(np.random.rand(2), n)[:n])
+        for t in range(TIMES): #@UnusedVariable
+            n = np.random.randint(1, 200)
+            if t % 5 == 4:
+                p = np.exp(np.random.randn(n) * 3)
+                p[np.random.rand(n) < 0.3] = 0.0
+            else:
+                p = tieWeights[t % 5](n)
+            p[np.random.randint(n)] = 1.0
+            prob, alias = _buildAliasTable(p)
+            self.assertTrue(np.all((prob >= 0) & (prob <= 1)))
+            pAlias = prob + np.bincount(alias, weights=1.0 - prob, minlength=n)
+            self.assertTrue(np.allclose(pAlias / n, p / p.sum(), atol=1e-12))
+            #the single pdf builder matches the batched one
+            batchProb, batchAlias = _buildAliasTables(p, [n])
+            self.assertTrue(np.all(prob == batchProb))
+            self.assertTrue(np.all(alias == batchAlias))
+        #pdfs longer than a block of the single pdf builder
+        p = np.random.randint(0, 5, 3 * 2 ** 16 + 5).astype(float)
+        p[0] = 1.0
+        prob, alias = _buildAliasTable(p, np.float32, np.int32)
+        batchProb, batchAlias = _buildAliasTables(p, [len(p)])
+        self.assertTrue(np.all(prob == batchProb.astype(np.float32)))
+        self.assertTrue(np.all(alias == batchAlias))
+        self.assertEqual(alias.dtype, np.int32)
+        p = np.array([0.2, 0.7, 0.7, 0.7, 0.1, 0.3])
+        prob, alias = _buildAliasTable(p)
+        pAlias = prob + np.bincount(alias, weights=1.0 - prob, minlength=6)
+        self.assertTrue(np.allclose(pAlias / 6, p / p.sum(), atol=1e-15))
+        #pdfs with tiny or huge sums
+        for scale in (1e-300, 1e300):
+            prob, alias = _buildAliasTable(np.array([1.0, 2.0, 1.0]) * scale)
+            pAlias = prob + np.bincount(alias, weights=1.0 - prob, minlength=3)
+            self.assertTrue(np.allclose(pAlias / 3, [0.25, 0.5, 0.25]))
+
+    def testSparseSupport(self):
+        '''Sparse mode samples only the given values and keeps small tables'''
+        x = [-10 ** 12, 0, 10 ** 12]
+        p = [1, 0, 3]
+        rng = randomArbitrary.RandomArbitraryInteger(x, p, sparse=True)
+        self.assertEqual(len(rng._prob), len(x))
+        r = rng.random(1000)
+        self.assertTrue(set(r.tolist()) == set([-10 ** 12, 10 ** 12]))
+        self.assertTrue(rng.random() in x)
+        for dtype in (np.int64, float):
+            out = rng.random_into(np.zeros(1000, dtype=dtype))
+            self.assertTrue(set(out.tolist()) == set([-10 ** 12, 10 ** 12]))
+
+        #switching modes keeps the distribution
+        x = [2, 5, 6]
+        rng.set_pdf(x, [1, 1, 0], sparse=False)
+        self.assertEqual(len(rng._prob), 5)
+        r = rng.random(1000)
+        self.assertTrue(set(r.tolist()) == set([2, 5]))
+
+    def testCompactTables(self):
+        '''Compact table dtypes keep the pdf up to their resolution'''
+        n = 1000
+        p = np.exp(np.random.randn(n) * 3)
+        p[::7] = 0.0
+        expected = p.cumsum() / p.sum()
+        for tableDtype, atol in (('float64', 1e-12), ('float32', 1e-6),
+                                 ('fixed', 1e-8)):
+            rng = randomArbitrary.RandomArbitraryInteger(
+                range(n), p, tableDtype=tableDtype)
+            self.assertEqual(rng._alias.dtype, np.uint16)
+            cdf = rng._cumulativeProbabilities()
+            self.assertTrue(np.allclose(cdf, expected, atol=atol))
+            r = rng.random(10000)
+            self.assertTrue(np.all(p[r] > 0))
+            out = rng.random_into(np.zeros(1000, dtype=np.int64))
+            self.assertTrue(np.all(p[out] > 0))
+            self.assertTrue(p[rng.random()] > 0)
+        self.assertEqual(rng._prob.dtype, np.uint32)
+        #every column is off by up to half a unit of the dtype, between its
+        #value and its alias. Full columns must not leak to their aliases
+        heavy = np.full(n, 1.0 / 3)
+        heavy[0] = n
+        for tableDtype, eps in (('float32', 2.0 ** -25), ('fixed', 2.0 ** -33)):
+            for values, pdf in ((range(4), [1, 1, 2, 0]), (range(n), p),
+                                (range(n), heavy)):
+                rng = randomArbitrary.RandomArbitraryInteger(
+                    values, pdf, tableDtype=tableDtype)
+                bound = (1 + np.bincount(rng._alias, minlength=rng._n)) * \
+                    eps / rng._n
+                error = np.abs(rng._probabilities() - pdf / np.sum(pdf))
+                self.assertTrue(np.all(error <= bound + 1e-16))
+        big = randomArbitrary.RandomArbitraryInteger([0, 10 ** 5])
+        self.assertEqual(big._alias.dtype, np.int32)
+        self.assertRaises(ValueError, rng.set_pdf, range(n), p,
+                          tableDtype='float16')
+
+    def testScalarWithCompactAliases(self):
+        '''Scalar random() returns the values, whatever the alias dtype'''
+        for x in ([-5, -4, -3], [65535, 65536, 65537]):
+            for tableDtype in ('float64', 'fixed'):
+                rng = randomArbitrary.RandomArbitraryInteger(
+                    x, [1, 0, 5], tableDtype=tableDtype)
+                self.assertEqual(rng._alias.dtype, np.uint16)
+                r = [rng.random() for i in range(200)]
+                self.assertEqual(set(r), set([x[0], x[2]]))
+                self.assertTrue(all(isinstance(v, int) for v in r))
+
+    def testSampleWithoutReplacement(self):
+        '''Distinct values, drawn in order proportionally to their weights'''
+        REPEATS = 20000
+        x = [3, 4, 5, 7]
+        p = np.array([1.0, 2.0, 3.0, 0.0])
+        rng = randomArbitrary.RandomArbitraryInteger(x, p, seed=4)
+        pairs = np.array([rng.sample_without_replacement(2)
+                          for i in range(REPEATS)])
+        self.assertTrue(np.all(pairs[:, 0] != pairs[:, 1]))
+        self.assertFalse(np.any(pairs == 7))
+        q = p[:3] / p.sum()
+        for i, value in enumerate(x[:3]):
+            self.assertAlmostEqual(np.mean(pairs[:, 0] == value), q[i],
+                                   delta=0.015)
+            #first drawn or drawn second after any other value
+            included = q[i] + sum(q[j] * q[i] / (1 - q[j])
+                                  for j in range(3) if j != i)
+            self.assertAlmostEqual(np.mean(np.any(pairs == value, axis=1)),
+                                   included, delta=0.015)
+        self.assertEqual(sorted(rng.sample_without_replacement(3)), [3, 4, 5])
+        self.assertEqual(len(rng.sample_without_replacement(0)), 0)
+        self.assertRaises(ValueError, rng.sample_without_replacement, 4)
+        sparse = randomArbitrary.RandomArbitraryInteger(
+            [-10 ** 9, 0, 10 ** 9], [1, 0, 1], sparse=True)
+        self.assertEqual(sorted(sparse.sample_without_replacement(2)),
+                         [-10 ** 9, 10 ** 9])
+
     @staticmethod
     def _chi2testSampleAgainsProbability(observed, expectedProbabilities):
         '''chi2 test to test whether a sample is consistent with expected prob.
@@ -111,9 +261,12 @@ class TestGeneralRandomInteger(testGeneral.TestRNG):
             #test it  
             nExpectedFalsePositives = int(REPEATS*ALPHA)
             if falsePositives > nExpectedFalsePositives:
-                pBinomialTest = stats.binom_test(falsePositives, 
-                                                 REPEATS, 
-                                                 ALPHA) * 2 #one-sided test, thus *2
+                #binom_test was removed from scipy 1.12 in favour of binomtest
+                binomTest = getattr(stats, 'binom_test', None) or \
+                    (lambda k, n, p: stats.binomtest(k, n, p).pvalue)
+                pBinomialTest = binomTest(falsePositives, 
+                                          REPEATS, 
+                                          ALPHA) * 2 #one-sided test, thus *2
                 if pBinomialTest < ALPHA:
                     #shit, there might be a problem
                     msg = '(%s) Failed sampling distribution test '\
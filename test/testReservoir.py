@@ -0,0 +1,56 @@
+import unittest
+import numpy as np
+
+import sys
+sys.path.append(r'../../')
+import randomArbitrary
+
+
+class TestWeightedReservoir(unittest.TestCase):
+
+    def testInclusionProbabilities(self):
+        '''Streamed chunks give the distribution of draws without replacement
+        '''
+        REPEATS = 5000
+        items = np.arange(6)
+        weights = np.array([1.0, 2.0, 3.0, 0.0, 4.0, 0.0])
+        counts = np.zeros(len(items))
+        first = np.zeros(len(items))
+        for i in range(REPEATS):
+            reservoir = randomArbitrary.WeightedReservoir(1, seed=i)
+            for chunk in np.array_split(np.arange(len(items)), 3):
+                reservoir.update(items[chunk], weights[chunk])
+            first[reservoir.sample()] += 1
+            reservoir = randomArbitrary.WeightedReservoir(3, seed=i)
+            for chunk in np.array_split(np.arange(len(items)), 4):
+                reservoir.update(items[chunk], weights[chunk])
+            sample = reservoir.sample()
+            self.assertEqual(len(set(sample.tolist())), 3)
+            counts[sample] += 1
+        self.assertTrue(np.allclose(first / REPEATS, weights / weights.sum(),
+                                    atol=0.03))
+        self.assertEqual(counts[3] + counts[5], 0)
+        #the least likely item is left out most often
+        self.assertTrue(counts[0] < counts[1] < counts[2] < counts[4])
+
+    def testMergeAndShortStreams(self):
+        '''Merged reservoirs keep k items, short streams keep all of them'''
+        seeds = np.random.SeedSequence(1).spawn(2)
+        a = randomArbitrary.WeightedReservoir(5, seed=seeds[0])
+        b = randomArbitrary.WeightedReservoir(5, seed=seeds[1])
+        a.update(np.arange(3), np.ones(3))
+        self.assertEqual(sorted(a.sample().tolist()), [0, 1, 2])
+        b.update(np.arange(100, 200), np.random.rand(100))
+        a += b
+        self.assertEqual(len(a), 5)
+        self.assertEqual(len(set(a.sample().tolist())), 5)
+        self.assertRaises(ValueError, a.merge,
+                          randomArbitrary.WeightedReservoir(4))
+        self.assertRaises(ValueError, a.update, [1, 2], [1.0, -1.0])
+        self.assertEqual(len(randomArbitrary.WeightedReservoir(2).sample()), 0)
+        empty = randomArbitrary.WeightedReservoir(0).update([1, 2], [1, 1])
+        self.assertEqual(len(empty.update([3], [1]).sample()), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import threading
+import unittest
+import numpy as np
+
+import sys
+sys.path.append(r'../../')
+import randomArbitrary
+from randomArbitrary.samplerCache import tableBytes
+
+
+class TestSamplerCache(unittest.TestCase):
+
+    def testHitsAndMisses(self):
+        '''Equal inputs return the same frozen sampler'''
+        cache = randomArbitrary.SamplerCache()
+        x = np.arange(10)
+        p = np.random.rand(10)
+        for cls in (randomArbitrary.RandomArbitrary,
+                    randomArbitrary.RandomArbitraryInteger):
+            a = cache.get(cls, x, p)
+            self.assertTrue(cache.get(cls, x.copy(), p.copy()) is a)
+            self.assertFalse(cache.get(cls, x, p * 2) is a)
+            self.assertRaises(ValueError, a.set_pdf, x, p)
+            for name in cls._SAVED_ARRAYS:
+                if getattr(a, name) is not None:
+                    self.assertFalse(getattr(a, name).flags.writeable)
+            a.random(10)
+        self.assertFalse(cache.get(randomArbitrary.RandomArbitrary, x, p,
+                                   Nrl=10) is
+                         cache.get(randomArbitrary.RandomArbitrary, x, p))
+        stats = cache.stats()
+        self.assertEqual(stats['hits'], 3)
+        self.assertEqual(stats['misses'], 5)
+        self.assertEqual(stats['entries'], 5)
+        self.assertRaises(ValueError, cache.get,
+                          randomArbitrary.RandomArbitrary, x, p, seed=1)
+
+    def testLRUEviction(self):
+        '''The least recently used samplers are evicted over the budget'''
+        cls = randomArbitrary.RandomArbitraryInteger
+        x = np.arange(100)
+        nbytes = tableBytes(cls(x))
+        cache = randomArbitrary.SamplerCache(maxBytes=2 * nbytes)
+        a = cache.get(cls, x, np.ones(100))
+        b = cache.get(cls, x, np.ones(100) * 2)
+        self.assertTrue(cache.get(cls, x, np.ones(100)) is a) #a is recent
+        cache.get(cls, x, np.ones(100) * 3) #evicts b
+        stats = cache.stats()
+        self.assertEqual(stats['evictions'], 1)
+        self.assertEqual(stats['bytes'], 2 * nbytes)
+        self.assertTrue(cache.get(cls, x, np.ones(100)) is a)
+        self.assertFalse(cache.get(cls, x, np.ones(100) * 2) is b)
+        big = cache.get(cls, np.arange(10000))
+        self.assertEqual(cache.stats()['bytes'], 2 * nbytes)
+        self.assertFalse(cache.get(cls, np.arange(10000)) is big)
+
+    def testThreads(self):
+        '''Concurrent requests share the cached samplers'''
+        cache = randomArbitrary.SamplerCache()
+        x = np.arange(1000)
+        results = []
+
+        def request():
+            for i in range(20):
+                results.append(cache.get(randomArbitrary.RandomArbitrary, x,
+                                         np.arange(1000) % (i % 4 + 2)))
+        threads = [threading.Thread(target=request) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(results), 160)
+        self.assertEqual(cache.stats()['entries'], 4)
+        self.assertEqual(len(set(id(r) for r in results)), 4)
+
+        #threads sampling from one cached sampler do not share scratch buffers
+        rng = cache.get(randomArbitrary.RandomArbitrary,
+                        np.linspace(0, 1, 101), np.ones(101))
+        valid = []
+
+        def sample():
+            out = np.empty(200000)
+            for i in range(10):
+                rng.random_into(out)
+                valid.append(np.all((out >= 0) & (out <= 1)))
+        threads = [threading.Thread(target=sample) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(valid, [True] * 40)
+
+
+if __name__ == "__main__":
+    unittest.main()
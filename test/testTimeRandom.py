@@ -0,0 +1,63 @@
+import unittest
+import numpy as np
+
+import sys
+sys.path.append(r'../../')
+import randomArbitrary
+
+
+class TestRandomTimeVarying(unittest.TestCase):
+
+    def _maxCdfError(self, theSample, x, p):
+        '''Kolmogorov-Smirnov distance to the piecewise linear cdf of p'''
+        theSample = np.sort(theSample)
+        cdf = np.interp(theSample, x, np.cumsum(p) / np.sum(p))
+        ecdf = np.arange(1, len(theSample) + 1) / float(len(theSample))
+        return np.max(np.abs(cdf - ecdf))
+
+    def testSnapshotsMatchRandomArbitrary(self):
+        '''Every snapshot is sampled like the exact mode of RandomArbitrary'''
+        SAMPLES = 20000
+        x = np.cumsum(np.random.rand(30) + 0.01)
+        ps = np.exp(np.random.randn(1440, 30))
+        ps[:, 0] = 0.0
+        ps[7, :15] = 0.0
+        ps[8:, -3:] = 0.0
+        rng = randomArbitrary.RandomArbitraryTimeVarying(x, ps, seed=2)
+        self.assertEqual(rng._cdf.shape, (1440 * 30, ))
+        #the rows must stay sorted where they are joined
+        self.assertTrue(np.all(np.diff(rng._cdf) >= 0))
+        for minute in (0, 7, 700, 1439):
+            t = np.full(SAMPLES, minute + 0.5)
+            theSample = rng.random(t)
+            self.assertTrue(np.all((theSample >= x[0]) & (theSample <= x[-1])))
+            self.assertTrue(self._maxCdfError(theSample, x, ps[minute]) < 0.02)
+        self.assertTrue(np.all(rng.random(np.full(100, 7.0)) >= x[14]))
+        self.assertTrue(np.isscalar(rng.random(3.0)))
+        self.assertEqual(rng.random(np.zeros((2, 3))).shape, (2, 3))
+
+    def testInterpolation(self):
+        '''Interpolated times follow the mixture of the adjacent snapshots'''
+        SAMPLES = 40000
+        x = np.array([0.0, 1.0, 2.0, 3.0])
+        ps = [[0, 1, 0, 0], [0, 0, 0, 1]]
+        times = [10.0, 20.0]
+        rng = randomArbitrary.RandomArbitraryTimeVarying(x, ps, times,
+                                                         interpolate=True)
+        theSample = rng.random(np.full(SAMPLES, 12.5))
+        self.assertAlmostEqual(np.mean(theSample > 2), 0.25, delta=0.01)
+        self.assertTrue(np.all(rng.random(np.full(100, 5.0)) <= 1))
+        self.assertTrue(np.all(rng.random(np.full(100, 25.0)) >= 2))
+        rng.interpolate = False
+        self.assertTrue(np.all(rng.random(np.full(100, 19.9)) <= 1))
+
+    def testBadArguments(self):
+        '''Bad snapshots raise ValueError'''
+        cls = randomArbitrary.RandomArbitraryTimeVarying
+        self.assertRaises(ValueError, cls, [0, 1], [1, 1])
+        self.assertRaises(ValueError, cls, [0, 1], [[1, 1], [0, 0]])
+        self.assertRaises(ValueError, cls, [0, 1], [[1, -1]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import numpy as np
+
+issortedAndUnique = lambda l: np.all(np.diff(l) > 0)
+
+
+class RandomArbitraryTimeVarying():
+    '''Random numbers from a distribution that changes over time.
+
+    The distribution is given by pdf snapshots over a shared grid `x`, e.g.
+    one per minute of the day. Every snapshot is sampled like the 'exact'
+    mode of RandomArbitrary: the point mass p[0] sits at x[0] and p[i] is
+    spread uniformly over [x[i-1], x[i]].
+
+    The cdfs of all the snapshots are stored row after row in a single
+    array, the cdf of snapshot i offset by i, so the array is sorted and one
+    np.searchsorted call samples any mix of snapshots. The offsets cost
+    log2(len(times)) bits of the precision of the uniform variates, which is
+    negligible for thousands of snapshots.
+    '''
+    def __init__(self, x, ps, times=None, interpolate=False, seed=None):
+        '''Initialize the object
+
+        @param x: sorted random variate values shared by the snapshots
+        @param ps: 2-D array, one pdf snapshot over `x` per row
+        @param times: sorted times of the snapshots. Default: 0, 1, 2, ...
+        @param interpolate: if False (default), a time is sampled from the
+            last snapshot at or before it. If True, it is sampled from the
+            linear interpolation of the pdfs of the snapshots around it,
+            i.e. from one of the two snapshots, picked with a probability
+            that decreases linearly with its distance in time
+        @param seed: None, an int, a numpy.random.SeedSequence, BitGenerator or
+            Generator. Anything numpy.random.default_rng accepts
+        '''
+        self._rng = np.random.default_rng(seed)
+        self.interpolate = interpolate
+        self.set_pdfs(x, ps, times)
+
+    def set_pdfs(self, x, ps, times=None):
+        '''Set the grid, the pdf snapshots and their times'''
+        x = np.array(x, dtype=float)
+        ps = np.array(ps, dtype=float)
+        assert issortedAndUnique(x)
+        if ps.ndim != 2 or ps.shape[1] != len(x):
+            raise ValueError('ps must hold one pdf over x per row')
+        if times is None:
+            times = np.arange(len(ps))
+        times = np.array(times, dtype=float)
+        assert len(times) == len(ps)
+        assert issortedAndUnique(times)
+        if np.any(ps < 0):
+            raise ValueError('Negative PDF values are not allowed')
+        sums = ps.sum(axis=1)
+        if np.any(sums == 0):
+            raise ValueError('Every snapshot needs a non-zero PDF value')
+        cdf = ps.cumsum(axis=1)
+        cdf /= sums[:, np.newaxis]
+        np.minimum(cdf, 1.0, out=cdf) #the sums may round to 1 + eps
+        cdf += np.arange(len(ps))[:, np.newaxis] #row i covers [i, i + 1]
+        self.x = x
+        self.times = times
+        self._cdf = cdf.reshape(-1)
+
+    def random(self, t):
+        '''Return one random number per time in `t`
+
+        @param t: a time or an array of times. Times outside the snapshot
+            times are sampled from the first or the last snapshot
+        @return: a scalar for a scalar `t`, otherwise an array of the shape
+            of `t`
+        '''
+        t = np.asarray(t, dtype=float)
+        rows = self._snapshots(t.reshape(-1))
+        y = self._inverseCdf(rows, self._rng.random(len(rows)))
+        if t.ndim == 0:
+            return y[0]
+        return y.reshape(t.shape)
+
+    def _snapshots(self, t):
+        '''Return the snapshot (row) to sample for every time in `t`'''
+        times = self.times
+        rows = np.searchsorted(times, t, side='right') - 1
+        np.clip(rows, 0, len(times) - 1, out=rows)
+        if not self.interpolate or len(times) == 1:
+            return rows
+        #pick the next snapshot with the weight of the time elapsed since
+        #the current one
+        lo = np.minimum(rows, len(times) - 2)
+        w = (t - times[lo]) / (times[lo + 1] - times[lo])
+        return lo + (self._rng.random(len(t)) < w)
+
+    def _inverseCdf(self, rows, u):
+        '''Piecewise linear inverse of the cdfs of `rows` evaluated at `u`
+
+        Like floatRandom._inverseCdf, with the search confined to the rows
+        '''
+        n = len(self.x)
+        start = rows * n
+        y = u + rows
+        hi = np.searchsorted(self._cdf, y, side='left')
+        np.clip(hi, start, start + n - 1, out=hi)
+        lo = np.maximum(hi - 1, start)
+        cdf = self._cdf
+        dCdf = cdf[hi] - cdf[lo]
+        frac = np.zeros(len(y))
+        np.divide(y - cdf[lo], dCdf, out=frac, where=dCdf > 0)
+        np.minimum(frac, 1.0, out=frac) #u + rows may round up to rows + 1
+        xLo = self.x[lo - start]
+        return xLo + (self.x[hi - start] - xLo) * frac
+
+
+if __name__ == '__main__':
+    pass
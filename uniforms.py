@@ -0,0 +1,54 @@
+import numpy as np
+
+UNIFORMS = ('pseudo', 'stratified', 'sobol', 'halton')
+
+
+class QuasiUniforms():
+    '''Source of variance-reducing uniform variates in [0, 1).
+
+    'stratified': every call for n numbers puts exactly one number in each
+        of the n strata [i/n, (i+1)/n), in random order. In one dimension
+        this is also a Latin hypercube sample.
+    'sobol', 'halton': scrambled low-discrepancy sequences of
+        scipy.stats.qmc (scipy>=1.7), continued across the calls. Sobol
+        points are balanced only in blocks whose size is a power of 2,
+        and scipy warns about other sizes.
+    '''
+    def __init__(self, method, rng):
+        '''
+        @param method: 'stratified', 'sobol' or 'halton'
+        @param rng: numpy.random.Generator used for the randomization
+        '''
+        if method not in UNIFORMS[1:]:
+            raise ValueError('Unknown uniforms %r' % (method, ))
+        self.method = method
+        self._rng = rng
+        self._engine = None
+        if method in ('sobol', 'halton'):
+            try:
+                from scipy.stats import qmc
+            except ImportError:
+                raise ImportError('%r uniforms require scipy>=1.7' % (method, ))
+            if method == 'sobol':
+                engine = qmc.Sobol
+            else:
+                engine = qmc.Halton
+            self._engine = engine(d=1, scramble=True, seed=rng)
+
+    def fill(self, u):
+        '''Fill the float array `u` with uniform variates and return it'''
+        n = len(u)
+        if self._engine is None:
+            np.add(self._rng.permutation(n), self._rng.random(n), out=u)
+            u /= n
+        else:
+            u[:] = self._engine.random(n)[:, 0]
+        return u
+
+
+def makeUniforms(method, rng):
+    '''Return a QuasiUniforms object, or None for plain pseudo-random numbers
+    '''
+    if method == 'pseudo':
+        return None
+    return QuasiUniforms(method, rng)